@@ -0,0 +1,116 @@
+import argparse
+import os
+
+from crossword import *
+from generate import CrosswordCreator
+
+
+def generate_batch(structures, words, output_dir,
+                   mode="solve", symmetry=False, decompose=True,
+                   images=False):
+    """
+    Fill every structure file in `structures` from the words file `words`,
+    building the vocabulary index once for the whole batch.
+
+    `mode` is one of:
+        "solve": write one solution per structure to `<name>.txt`
+        "all":   stream every solution per structure to `<name>.txt`
+        "count": write the number of solutions to `counts.tsv`, one
+                 line per structure
+
+    If `images` is True, every solution written is also rendered to
+    `<name>-<n>.png` in `output_dir`.
+
+    Yield (structure, number of solutions written or counted) as each
+    structure finishes.
+    """
+    if images:
+        from render import renderer
+    os.makedirs(output_dir, exist_ok=True)
+    vocabulary = Vocabulary.load(words)
+
+    # Start a fresh counts file, so that rerunning a batch into the same
+    # directory does not repeat rows
+    counts = os.path.join(output_dir, "counts.tsv")
+    if mode == "count":
+        open(counts, "w").close()
+
+    for structure in structures:
+        crossword = Crossword(structure, words, vocabulary=vocabulary)
+        creator = CrosswordCreator(crossword)
+        name = os.path.splitext(os.path.basename(structure))[0]
+
+        if mode == "count":
+            count = creator.count_solutions(
+                symmetry=symmetry, decompose=decompose
+            )
+            with open(counts, "a") as f:
+                f.write(f"{structure}\t{count}\n")
+            yield structure, count
+            continue
+
+        if mode == "all":
+            solutions = creator.iter_solutions(symmetry=symmetry)
+        else:
+            assignment = creator.solve()
+            solutions = [] if assignment is None else [assignment]
+
+        count = 0
+        with open(os.path.join(output_dir, f"{name}.txt"), "w") as f:
+            for assignment in solutions:
+                if count:
+                    f.write("\n")
+                f.write(creator.grid_text(assignment) + "\n")
+                f.flush()
+                if images:
+                    renderer().save(
+                        crossword, creator.letter_grid(assignment),
+                        os.path.join(output_dir, f"{name}-{count}.png")
+                    )
+                count += 1
+        yield structure, count
+
+
+def main():
+
+    # Parse command-line arguments
+    parser = argparse.ArgumentParser(
+        usage="python batch.py words output_dir structure [structure ...]"
+    )
+    parser.add_argument("words")
+    parser.add_argument("output_dir")
+    parser.add_argument("structures", nargs="+")
+    modes = parser.add_mutually_exclusive_group()
+    modes.add_argument(
+        "--all", dest="mode", action="store_const", const="all",
+        help="write every solution of each structure"
+    )
+    modes.add_argument(
+        "--count", dest="mode", action="store_const", const="count",
+        help="only count the solutions of each structure"
+    )
+    parser.add_argument(
+        "--symmetry", action="store_true",
+        help="treat transposed solutions of symmetric grids as one"
+    )
+    parser.add_argument(
+        "--no-decompose", dest="decompose", action="store_false",
+        help="count independent subgrids together"
+    )
+    parser.add_argument(
+        "--images", action="store_true",
+        help="also render every solution written to a PNG file"
+    )
+    parser.set_defaults(mode="solve")
+    args = parser.parse_args()
+
+    for structure, count in generate_batch(
+        args.structures, args.words, args.output_dir,
+        mode=args.mode, symmetry=args.symmetry, decompose=args.decompose,
+        images=args.images
+    ):
+        print(f"{structure}: {count}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,3 +1,8 @@
+import hashlib
+import os
+import pickle
+
+
 class Variable():
 
     ACROSS = "across"
@@ -9,6 +14,7 @@ class Variable():
         self.j = j
         self.direction = direction
         self.length = length
+        self._hash = hash((self.i, self.j, self.direction, self.length))
         self.cells = []
         for k in range(self.length):
             self.cells.append(
@@ -17,7 +23,11 @@ class Variable():
             )
 
     def __hash__(self):
-        return hash((self.i, self.j, self.direction, self.length))
+        return self._hash
+
+    def __reduce__(self):
+        # Rebuild through __init__ so the cached hash matches the process
+        return (Variable, (self.i, self.j, self.direction, self.length))
 
     def __eq__(self, other):
         return (
@@ -35,9 +45,94 @@ class Variable():
         return f"Variable({self.i}, {self.j}, {direction}, {self.length})"
 
 
+class Overlaps(dict):
+    """
+    Overlaps between pairs of variables. Only crossing pairs are stored,
+    but any pair of distinct variables can be looked up: pairs that do not
+    cross give None.
+    """
+
+    def __init__(self, variables):
+        super().__init__()
+        self.variables = variables
+
+    def __missing__(self, key):
+        v1, v2 = key
+        if v1 != v2 and v1 in self.variables and v2 in self.variables:
+            return None
+        raise KeyError(key)
+
+
+class Vocabulary():
+
+    # Bump whenever the pickled layout changes so stale caches are rebuilt
+    CACHE_VERSION = 2
+
+    def __init__(self, words):
+        """Index a collection of uppercase words by length."""
+        buckets = dict()
+        for word in words:
+            if word:
+                buckets.setdefault(len(word), set()).add(word)
+
+        # Words bucketed by length
+        self.buckets = {
+            length: frozenset(bucket) for length, bucket in buckets.items()
+        }
+        self._words = None
+
+    @property
+    def words(self):
+        """The set of all words, built on first use."""
+        if self._words is None:
+            self._words = frozenset().union(*self.buckets.values())
+        return self._words
+
+    @classmethod
+    def load(cls, words_file):
+        """
+        Load the vocabulary in `words_file`, reusing the binary cache stored
+        next to it when it was built from a file with the same contents.
+        """
+        with open(words_file, "rb") as f:
+            data = f.read()
+        digest = hashlib.sha256(data).hexdigest()
+        cache_file = words_file + ".vocab"
+
+        # The cache holds only builtin types, so it loads whatever module
+        # this class was imported from
+        try:
+            with open(cache_file, "rb") as f:
+                version, cached_digest, buckets = pickle.load(f)
+            if (version == cls.CACHE_VERSION and cached_digest == digest
+                    and isinstance(buckets, dict)):
+                vocabulary = cls(())
+                vocabulary.buckets = buckets
+                return vocabulary
+        except (OSError, pickle.UnpicklingError, EOFError, ValueError,
+                TypeError, AttributeError, ImportError):
+            pass
+
+        vocabulary = cls(data.decode().upper().splitlines())
+        try:
+            with open(cache_file + ".tmp", "wb") as f:
+                pickle.dump(
+                    (cls.CACHE_VERSION, digest, vocabulary.buckets), f,
+                    protocol=pickle.HIGHEST_PROTOCOL
+                )
+            os.replace(cache_file + ".tmp", cache_file)
+        except OSError:
+            pass
+        return vocabulary
+
+    def bucket(self, length):
+        """Return the set of words with the given length."""
+        return self.buckets.get(length, frozenset())
+
+
 class Crossword():
 
-    def __init__(self, structure_file, words_file):
+    def __init__(self, structure_file, words_file, vocabulary=None):
 
         # Determine structure of crossword
         with open(structure_file) as f:
@@ -58,8 +153,10 @@ class Crossword():
                 self.structure.append(row)
 
         # Save vocabulary list
-        with open(words_file) as f:
-            self.words = set(f.read().upper().splitlines())
+        # A preloaded `vocabulary` may be shared between crosswords
+        if vocabulary is None:
+            vocabulary = Vocabulary.load(words_file)
+        self.vocabulary = vocabulary
 
         # Determine variable set
         self.variables = set()
@@ -104,30 +201,66 @@ class Crossword():
                             length=length
                         ))
 
+        # Index every cell by the variables crossing it, along with the
+        # position of the cell within each of those variables
+        self.cells = dict()
+        for var in self.variables:
+            for k, cell in enumerate(var.cells):
+                self.cells.setdefault(cell, []).append((var, k))
+
         # Compute overlaps for each word
         # For any pair of variables v1, v2, their overlap is either:
         #    None, if the two variables do not overlap; or
         #    (i, j), where v1's ith character overlaps v2's jth character
-        self.overlaps = dict()
-        for v1 in self.variables:
-            for v2 in self.variables:
-                if v1 == v2:
-                    continue
-                cells1 = v1.cells
-                cells2 = v2.cells
-                intersection = set(cells1).intersection(cells2)
-                if not intersection:
-                    self.overlaps[v1, v2] = None
-                else:
-                    intersection = intersection.pop()
-                    self.overlaps[v1, v2] = (
-                        cells1.index(intersection),
-                        cells2.index(intersection)
-                    )
+        # Only the (i, j) entries are stored, found through the cell index.
+        # self.adjacency[v1] maps each neighbor v2 of v1 to that same (i, j).
+        self.overlaps = Overlaps(self.variables)
+        self.adjacency = {var: dict() for var in self.variables}
+        for crossing in self.cells.values():
+            for v1, k1 in crossing:
+                for v2, k2 in crossing:
+                    if v1 != v2:
+                        self.overlaps[v1, v2] = (k1, k2)
+                        self.adjacency[v1][v2] = (k1, k2)
+
+    @property
+    def words(self):
+        """The set of all words in the vocabulary."""
+        return self.vocabulary.words
 
     def neighbors(self, var):
         """Given a variable, return set of overlapping variables."""
-        return set(
-            v for v in self.variables
-            if v != var and self.overlaps[v, var]
+        return set(self.adjacency[var])
+
+    def components(self):
+        """
+        Return the connected components of the overlap graph, as a list of
+        sets of variables that share no cell with any other component.
+        """
+        components = []
+        seen = set()
+        for var in self.variables:
+            if var in seen:
+                continue
+            component = {var}
+            frontier = [var]
+            while frontier:
+                for neighbor in self.adjacency[frontier.pop()]:
+                    if neighbor not in component:
+                        component.add(neighbor)
+                        frontier.append(neighbor)
+            seen |= component
+            components.append(component)
+        return components
+
+    def symmetric(self):
+        """
+        Return True if the structure is unchanged by transposition, in which
+        case transposing any solution (swapping across and down words)
+        yields another solution.
+        """
+        return self.height == self.width and all(
+            self.structure[i][j] == self.structure[j][i]
+            for i in range(self.height)
+            for j in range(i)
         )
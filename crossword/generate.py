@@ -1,20 +1,61 @@
-import sys
+import argparse
+import heapq
+import multiprocessing
+import random
+
+from collections import Counter, deque
 
 from crossword import *
 
 
+class Restart(Exception):
+    """Raised when a randomized search exhausts its node budget."""
+
+
 class CrosswordCreator():
 
-    def __init__(self, crossword):
+    MRV = "mrv"
+    DOM_WDEG = "domwdeg"
+
+    # Node budget of the first randomized run, and its growth per restart
+    RESTART_BASE = 100
+    RESTART_GROWTH = 1.5
+
+    def __init__(self, crossword, ordering=MRV, seed=None, variables=None):
         """
         Create new CSP crossword generate.
+
+        `ordering` picks the variable ordering heuristic, either minimum
+        remaining values or dom/wdeg. Passing a `seed` randomizes tie-breaks
+        and switches `solve` to restarts with a growing node budget.
+        `variables` restricts the problem to a union of components of the
+        overlap graph; by default every variable is solved.
         """
         self.crossword = crossword
+        self.variables = (
+            crossword.variables if variables is None else set(variables)
+        )
+        self.ordering = ordering
+        self.random = random.Random(seed) if seed is not None else None
+
+        # dom/wdeg constraint weights, bumped whenever an arc wipes out a domain
+        self.weights = dict()
+
+        # Node counter and budget of the current randomized run
+        self.nodes = 0
+        self.node_limit = None
+
+        # Every domain starts out as the shared, read-only vocabulary bucket
+        # for its length, and `prune` gives it a set of its own on the first
+        # removal, so unpruned domains cost no memory per variable
         self.domains = {
-            var: self.crossword.words.copy()
-            for var in self.crossword.variables
+            var: self.crossword.vocabulary.bucket(var.length)
+            for var in self.variables
         }
 
+        # Undo stack of (variable, word) pairs pruned from `self.domains`
+        self.trail = []
+
     def letter_grid(self, assignment):
         """
         Return 2D array representing a given assignment.
@@ -35,63 +76,185 @@ class CrosswordCreator():
         """
         Print crossword assignment to the terminal.
         """
-        letters = self.letter_grid(assignment)
-        for i in range(self.crossword.height):
-            for j in range(self.crossword.width):
-                if self.crossword.structure[i][j]:
-                    print(letters[i][j] or " ", end="")
-                else:
-                    print("█", end="")
-            print()
+        print(self.grid_text(assignment))
 
     def save(self, assignment, filename):
         """
         Save crossword assignment to an image file.
         """
-        from PIL import Image, ImageDraw, ImageFont
-        cell_size = 100
-        cell_border = 2
-        interior_size = cell_size - 2 * cell_border
-        letters = self.letter_grid(assignment)
-
-        # Create a blank canvas
-        img = Image.new(
-            "RGBA",
-            (self.crossword.width * cell_size,
-             self.crossword.height * cell_size),
-            "black"
+        from render import renderer
+        renderer().save(
+            self.crossword, self.letter_grid(assignment), filename
         )
-        font = ImageFont.truetype("assets/fonts/OpenSans-Regular.ttf", 80)
-        draw = ImageDraw.Draw(img)
-
-        for i in range(self.crossword.height):
-            for j in range(self.crossword.width):
-
-                rect = [
-                    (j * cell_size + cell_border,
-                     i * cell_size + cell_border),
-                    ((j + 1) * cell_size - cell_border,
-                     (i + 1) * cell_size - cell_border)
-                ]
-                if self.crossword.structure[i][j]:
-                    draw.rectangle(rect, fill="white")
-                    if letters[i][j]:
-                        _, _, w, h = draw.textbbox((0, 0), letters[i][j], font=font)
-                        draw.text(
-                            (rect[0][0] + ((interior_size - w) / 2),
-                             rect[0][1] + ((interior_size - h) / 2) - 10),
-                            letters[i][j], fill="black", font=font
-                        )
-
-        img.save(filename)
 
     def solve(self):
         """
         Enforce node and arc consistency, and then solve the CSP.
         """
         self.enforce_node_consistency()
-        self.ac3()
-        return self.backtrack(dict())
+        if not self.ac3():
+            return None
+        self.trail.clear()
+
+        if self.random is None:
+            return self.backtrack(dict())
+
+        self.node_limit = self.RESTART_BASE
+        while True:
+            self.nodes = 0
+            try:
+                return self.backtrack(dict())
+            except Restart:
+                self.undo(0)
+                self.node_limit = int(self.node_limit * self.RESTART_GROWTH)
+
+    def iter_solutions(self, symmetry=False):
+        """
+        Enforce node and arc consistency, and then yield every complete
+        assignment of the CSP.
+
+        If `symmetry` is True and the structure is symmetric, yield only one
+        of each pair of solutions that are transposes of each other.
+        """
+        self.enforce_node_consistency()
+        if not self.ac3():
+            return
+        self.trail.clear()
+
+        # Only a full grid can be filtered by its transpose
+        canonical = (
+            symmetry and self.variables == self.crossword.variables
+            and self.crossword.symmetric()
+        )
+        for assignment in self.search(dict()):
+            if canonical and not self.canonical(assignment):
+                continue
+            yield dict(assignment)
+
+    def count_solutions(self, symmetry=False, decompose=True):
+        """
+        Return the number of complete assignments of the CSP.
+
+        If `decompose` is True, the solutions of each independent component
+        are enumerated separately and combined, instead of enumerating the
+        product of all of them. Only words whose length occurs in more
+        than one component can repeat across components, so each solution
+        is reduced to those words, and the components are combined one at
+        a time keeping count of the shared words used so far.
+        If `symmetry` is True and the structure is symmetric, count pairs of
+        transposed solutions once.
+        """
+        components = self.crossword.components()
+        components = [
+            component for component in components
+            if component <= self.variables
+        ]
+
+        if decompose and len(components) > 1:
+            count = self._count_components(components)
+        else:
+            self.enforce_node_consistency()
+            if not self.ac3():
+                return 0
+            self.trail.clear()
+            count = sum(1 for _ in self.search(dict()))
+
+        # A transposed solution uses each word twice, so no solution is its
+        # own transpose and solutions pair up exactly
+        if symmetry and self.variables == self.crossword.variables:
+            if self.crossword.symmetric():
+                count //= 2
+        return count
+
+    def _count_components(self, components):
+        """
+        Return the number of ways to fill all `components` together with
+        no word used twice.
+        """
+        lengths = [{var.length for var in component} for component in components]
+        shared = {
+            length for a, first in enumerate(lengths)
+            for second in lengths[a + 1:]
+            for length in first & second
+        }
+
+        # Number of solutions of each component by the shared words in them
+        fills = []
+        for component in components:
+            creator = CrosswordCreator(self.crossword, variables=component)
+            fill = Counter(
+                frozenset(
+                    word for word in assignment.values()
+                    if len(word) in shared
+                )
+                for assignment in creator.iter_solutions()
+            )
+            if not fill:
+                return 0
+            fills.append(fill)
+
+        # Number of ways to fill the components so far by the shared words
+        # used that later components could still repeat
+        used = Counter({frozenset(): 1})
+        for index, fill in enumerate(fills):
+            later = set().union(*lengths[index + 1:])
+            combined = Counter()
+            for words, ways in used.items():
+                for new_words, new_ways in fill.items():
+                    if words.isdisjoint(new_words):
+                        key = frozenset(
+                            word for word in words | new_words
+                            if len(word) in later
+                        )
+                        combined[key] += ways * new_ways
+            used = combined
+        return sum(used.values())
+
+    def canonical(self, assignment):
+        """
+        Return True if `assignment` is the representative of itself and its
+        transpose, i.e. its grid reads no later than the transposed grid.
+        """
+        letters = self.letter_grid(assignment)
+        return letters <= [list(column) for column in zip(*letters)]
+
+    def search(self, assignment):
+        """
+        Yield every complete extension of the partial `assignment`, using the
+        same inference as `backtrack`. The yielded assignment is modified
+        further as the search resumes, so callers must copy it to keep it.
+        """
+        if self.assignment_complete(assignment):
+            yield assignment
+            return
+
+        var = self.select_unassigned_variable(assignment)
+        if var is None:
+            return
+
+        for value in self.order_domain_values(var, assignment):
+            if not self.consistent_value(var, value, assignment):
+                continue
+            assignment[var] = value
+            mark = len(self.trail)
+            if self.infer(var, value, assignment):
+                yield from self.search(assignment)
+            self.undo(mark)
+            assignment.pop(var)
+
+    def grid_text(self, assignment):
+        """
+        Return the letters of `assignment` as one line of text per row,
+        with blocked cells drawn as `█`.
+        """
+        letters = self.letter_grid(assignment)
+        return "\n".join(
+            "".join(
+                (letters[i][j] or " ") if self.crossword.structure[i][j] else "█"
+                for j in range(self.crossword.width)
+            )
+            for i in range(self.crossword.height)
+        )
 
     def enforce_node_consistency(self):
         """
@@ -99,10 +262,10 @@ class CrosswordCreator():
         (Remove any values that are inconsistent with a variable's unary
          constraints; in this case, the length of the word.)
         """
-        for domain in self.domains.copy():
-            for value in self.domains[domain].copy():
-                if domain.length != len(value):
-                    self.domains[domain].remove(value)
+        for var, domain in list(self.domains.items()):
+            self.prune(
+                var, [value for value in domain if len(value) != var.length]
+            )
 
     def revise(self, x, y):
         """
@@ -113,24 +276,34 @@ class CrosswordCreator():
         Return True if a revision was made to the domain of `x`; return
         False if no revision was made.
         """
-        changed = False
-        overlap = self.crossword.overlaps.get((x,y))
+        overlap = self.crossword.overlaps.get((x, y))
+        if not overlap:
+            return False
+        index_x, index_y = overlap
 
-        if overlap:
-            index_x, index_y = overlap
+        # Letters `y` can still place on the shared cell
+        supported = {yword[index_y] for yword in self.domains[y]}
 
-            for xword in self.domains[x].copy():     
-                conflict = True   
-                for yword in self.domains[y]:
-                    if xword[index_x] == yword[index_y]:
-                        conflict = False
-                        break
-                
-                if conflict:
-                    self.domains[x].remove(xword)
-                    changed = True
+        removed = [
+            xword for xword in self.domains[x]
+            if xword[index_x] not in supported
+        ]
+        self.prune(x, removed)
+        return bool(removed)
 
-        return changed
+    def prune(self, var, words):
+        """
+        Remove `words` from the domain of `var`, recording them on the trail.
+        A domain still shared with the vocabulary is replaced by a new set.
+        """
+        if not words:
+            return
+        domain = self.domains[var]
+        if isinstance(domain, frozenset):
+            self.domains[var] = set(domain.difference(words))
+        else:
+            domain.difference_update(words)
+        self.trail.extend((var, word) for word in words)
 
     def ac3(self, arcs=None):
         """
@@ -141,34 +314,42 @@ class CrosswordCreator():
         Return True if arc consistency is enforced and no domains are empty;
         return False if one or more domains end up empty.
         """
-        
         if arcs is None:
-            arcs = []
-            for x in self.domains:
-                for y in self.domains:
-                    if x != y:
-                        arc = (x, y)
-                        arcs.append(arc)
-        
-        while len(arcs) > 0:
-            (x,y) = arcs.pop(0)
-            if self.revise(x,y):
-                if len(self.domains[x]) == 0:
+            arcs = [
+                (x, y)
+                for x in self.domains
+                for y in self.crossword.adjacency[x]
+            ]
+
+        # Worklist of pending arcs; `queued` keeps each arc in it at most once
+        queue = deque()
+        queued = set()
+        for arc in arcs:
+            if arc not in queued:
+                queue.append(arc)
+                queued.add(arc)
+
+        while queue:
+            x, y = queue.popleft()
+            queued.discard((x, y))
+            if self.revise(x, y):
+                if not self.domains[x]:
+                    self.weights[x, y] = self.weights.get((x, y), 1) + 1
+                    self.weights[y, x] = self.weights[x, y]
                     return False
-                for z in self.crossword.neighbors(x):
-                    arcs.append((z,x))
-
-
+                for z in self.crossword.adjacency[x]:
+                    if z != y and (z, x) not in queued:
+                        queue.append((z, x))
+                        queued.add((z, x))
 
-
-        
+        return True
 
     def assignment_complete(self, assignment):
         """
         Return True if `assignment` is complete (i.e., assigns a value to each
         crossword variable); return False otherwise.
         """
-        variables = self.crossword.variables
+        variables = self.variables
         assigned_variables = assignment.keys()
 
         return variables == assigned_variables
@@ -192,13 +373,12 @@ class CrosswordCreator():
 
         # Check for conflicts between neighboring variables
         for variable in variables:
-            for neighbor in self.crossword.neighbors(variable):
+            for neighbor, (index_variable, index_neighbor) in (
+                self.crossword.adjacency[variable].items()
+            ):
                 if neighbor in assignment:
-                    overlap = self.crossword.overlaps.get((variable, neighbor))
-                    if overlap:
-                        index_variable, index_neighbor = overlap
-                        if assignment[variable][index_variable] != assignment[neighbor][index_neighbor]:
-                            return False
+                    if assignment[variable][index_variable] != assignment[neighbor][index_neighbor]:
+                        return False
 
         return True
 
@@ -206,30 +386,41 @@ class CrosswordCreator():
 
     def order_domain_values(self, var, assignment):
         """
-        Return a list of values in the domain of `var`, in order by
+        Yield the values in the domain of `var`, in order by
         the number of values they rule out for neighboring variables.
-        The first value in the list, for example, should be the one
+        The first value yielded, for example, is the one
         that rules out the fewest values among the neighbors of `var`.
         """
-        values = []
-        domain = self.domains[var]
-
-        for instance in domain:
-            constraint_values = 0
-            for neighbor in self.crossword.neighbors(var):
-                if neighbor not in assignment:
-                    for value in self.domains[neighbor]:
-                        overlap = self.crossword.overlaps.get((var, neighbor))
-                        if overlap:
-                            index_var, index_neighbor = overlap
-                            if instance[index_var] == value[index_neighbor]:
-                                constraint_values += 1
-                                break
-            values.append((instance, constraint_values))
-
-        values.sort(key=lambda x: x[1]) 
-        return [val[0] for val in values]
-
+        # For each open neighbor: the position of the shared cell in `var`,
+        # the neighbor's domain size, and its letter counts on that cell
+        letter_counts = []
+        for neighbor, (index_var, index_neighbor) in (
+            self.crossword.adjacency[var].items()
+        ):
+            if neighbor not in assignment:
+                domain = self.domains[neighbor]
+                letter_counts.append((
+                    index_var,
+                    len(domain),
+                    Counter(word[index_neighbor] for word in domain)
+                ))
+
+        # A neighbor word is ruled out when its letter on the shared cell
+        # differs from the candidate's
+        heap = []
+        for value in self.domains[var]:
+            ruled_out = sum(
+                size - counts[value[index_var]]
+                for index_var, size, counts in letter_counts
+            )
+            if self.random is None:
+                heap.append((ruled_out, value))
+            else:
+                heap.append((ruled_out, self.random.random(), value))
+        heapq.heapify(heap)
+
+        while heap:
+            yield heapq.heappop(heap)[-1]
 
     def select_unassigned_variable(self, assignment):
         """
@@ -239,11 +430,87 @@ class CrosswordCreator():
         degree. If there is a tie, any of the tied variables are acceptable
         return values.
         """
-        unassigned_variables = [var for var in self.crossword.variables if var not in assignment]
-        unassigned_variables.sort(key=lambda var: (len(self.domains[var]), -len(self.crossword.neighbors(var))))
-        return unassigned_variables[0] if unassigned_variables else None
+        unassigned_variables = [var for var in self.variables if var not in assignment]
+        if not unassigned_variables:
+            return None
+
+        if self.ordering == self.DOM_WDEG:
+            def key(var):
+                weight = sum(
+                    self.weights.get((var, neighbor), 1)
+                    for neighbor in self.crossword.adjacency[var]
+                    if neighbor not in assignment
+                )
+                return len(self.domains[var]) / max(weight, 1)
+        else:
+            def key(var):
+                return (len(self.domains[var]), -len(self.crossword.adjacency[var]))
+
+        if self.random is None:
+            return min(unassigned_variables, key=key)
+        return min(
+            unassigned_variables,
+            key=lambda var: (key(var), self.random.random())
+        )
+
+    def consistent_value(self, var, value, assignment):
+        """
+        Return True if assigning `value` to `var` is consistent with the
+        partial `assignment`, checking only the constraints touching `var`.
+        """
+        if var.length != len(value):
+            return False
+
+        for other, word in assignment.items():
+            if other != var and word == value:
+                return False
+
+        for neighbor, (index_var, index_neighbor) in (
+            self.crossword.adjacency[var].items()
+        ):
+            if neighbor in assignment:
+                if value[index_var] != assignment[neighbor][index_neighbor]:
+                    return False
+
+        return True
+
+    def infer(self, var, value, assignment):
+        """
+        Maintain arc consistency after assigning `value` to `var`.
+        Every pruned value is recorded on `self.trail` so `undo` can restore
+        the domains.
+
+        Return False if some domain is wiped out, True otherwise.
+        """
+        self.prune(var, [word for word in self.domains[var] if word != value])
+
+        arcs = [
+            (z, var) for z in self.crossword.adjacency[var]
+            if z not in assignment
+        ]
+
+        # Words may not repeat, so drop `value` from every other open domain
+        for other in self.domains:
+            if other == var or other in assignment:
+                continue
+            if value in self.domains[other]:
+                self.prune(other, [value])
+                if not self.domains[other]:
+                    return False
+                arcs.extend(
+                    (z, other) for z in self.crossword.adjacency[other]
+                    if z not in assignment
+                )
 
-        
+        return self.ac3(arcs)
+
+    def undo(self, mark):
+        """
+        Restore every value pruned since the trail had length `mark`.
+        """
+        while len(self.trail) > mark:
+            var, word = self.trail.pop()
+            self.domains[var].add(word)
 
     def backtrack(self, assignment):
         """
@@ -257,47 +524,159 @@ class CrosswordCreator():
         if self.assignment_complete(assignment):
             return assignment
 
+        self.nodes += 1
+        if self.node_limit is not None and self.nodes > self.node_limit:
+            raise Restart()
+
         var = self.select_unassigned_variable(assignment)
         if var is None:
             return None
 
         for value in self.order_domain_values(var, assignment):
-            if self.consistent({**assignment, **{var: value}}):
-                assignment[var] = value
+            if not self.consistent_value(var, value, assignment):
+                continue
+            assignment[var] = value
+            mark = len(self.trail)
+            if self.infer(var, value, assignment):
                 result = self.backtrack(assignment)
                 if result is not None:
                     return result
-                assignment.pop(var)
+            self.undo(mark)
+            assignment.pop(var)
 
         return None
 
 
+# Solver configurations raced against each other by `solve_portfolio`
+PORTFOLIO = [
+    dict(ordering=CrosswordCreator.MRV),
+    dict(ordering=CrosswordCreator.DOM_WDEG),
+    dict(ordering=CrosswordCreator.MRV, seed=1),
+    dict(ordering=CrosswordCreator.DOM_WDEG, seed=2),
+    dict(ordering=CrosswordCreator.MRV, seed=3),
+    dict(ordering=CrosswordCreator.DOM_WDEG, seed=4),
+]
 
+# Crossword shared by the portfolio worker processes
+_crossword = None
 
 
-def main():
+def _init_worker(crossword):
+    global _crossword
+    _crossword = crossword
+
+
+def _solve_configuration(options):
+    return CrosswordCreator(_crossword, **options).solve()
+
+
+def solve_portfolio(crossword, configurations=None, processes=None):
+    """
+    Solve `crossword` with several solver configurations in parallel, and
+    return the assignment of whichever finishes first (None if it proved
+    there is no solution). The remaining workers are terminated.
+    """
+    if configurations is None:
+        configurations = PORTFOLIO
+    if processes is None:
+        processes = min(len(configurations), multiprocessing.cpu_count())
+
+    with multiprocessing.Pool(
+        processes, initializer=_init_worker, initargs=(crossword,)
+    ) as pool:
+        for assignment in pool.imap_unordered(
+            _solve_configuration, configurations
+        ):
+            # Leaving the block terminates the still-running configurations
+            return assignment
 
-    # Check usage
-    if len(sys.argv) not in [3, 4]:
-        sys.exit("Usage: python generate.py structure words [output]")
+
+def _solve_component(component):
+    return CrosswordCreator(_crossword, variables=component).solve()
+
+
+def solve_components(crossword, processes=None):
+    """
+    Solve each connected component of the overlap graph of `crossword` in
+    its own process, then merge the partial fills.
+
+    Components are solved independently, so two of them may pick the same
+    word; such a component is re-solved with the words already taken
+    removed from its domains. If that fails, fall back to solving the
+    whole crossword as one problem.
+    """
+    # Largest first, so clashes are repaired on the cheaper components
+    components = sorted(crossword.components(), key=len, reverse=True)
+    if len(components) < 2:
+        return CrosswordCreator(crossword).solve()
+    if processes is None:
+        processes = min(len(components), multiprocessing.cpu_count())
+
+    with multiprocessing.Pool(
+        processes, initializer=_init_worker, initargs=(crossword,)
+    ) as pool:
+        results = pool.map(_solve_component, components)
+
+    # A component with no fill of its own leaves the crossword unsolvable
+    if any(result is None for result in results):
+        return None
+
+    assignment = dict()
+    used = set()
+    for component, result in zip(components, results):
+        if not used.isdisjoint(result.values()):
+            creator = CrosswordCreator(crossword, variables=component)
+            for var, domain in list(creator.domains.items()):
+                creator.prune(var, domain & used)
+            result = creator.solve()
+            if result is None:
+                return CrosswordCreator(crossword).solve()
+        assignment.update(result)
+        used.update(result.values())
+
+    return assignment
+
+
+def main():
 
     # Parse command-line arguments
-    structure = sys.argv[1]
-    words = sys.argv[2]
-    output = sys.argv[3] if len(sys.argv) == 4 else None
+    parser = argparse.ArgumentParser(
+        usage="python generate.py structure words [output]"
+    )
+    parser.add_argument("structure")
+    parser.add_argument("words")
+    parser.add_argument("output", nargs="?")
+    parser.add_argument(
+        "--portfolio", action="store_true",
+        help="race several solver configurations in parallel"
+    )
+    parser.add_argument(
+        "--components", action="store_true",
+        help="solve independent subgrids in parallel"
+    )
+    parser.add_argument(
+        "--processes", type=int,
+        help="number of worker processes for --portfolio or --components"
+    )
+    args = parser.parse_args()
 
     # Generate crossword
-    crossword = Crossword(structure, words)
+    crossword = Crossword(args.structure, args.words)
     creator = CrosswordCreator(crossword)
-    assignment = creator.solve()
+    if args.portfolio:
+        assignment = solve_portfolio(crossword, processes=args.processes)
+    elif args.components:
+        assignment = solve_components(crossword, processes=args.processes)
+    else:
+        assignment = creator.solve()
 
     # Print result
     if assignment is None:
         print("No solution.")
     else:
         creator.print(assignment)
-        if output:
-            creator.save(assignment, output)
+        if args.output:
+            creator.save(assignment, args.output)
 
 
 if __name__ == "__main__":
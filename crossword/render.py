@@ -0,0 +1,107 @@
+import os
+
+
+class Renderer():
+
+    FONT = os.path.join(
+        os.path.dirname(os.path.abspath(__file__)),
+        "assets", "fonts", "OpenSans-Regular.ttf"
+    )
+
+    def __init__(self, cell_size=100, cell_border=2, font_size=80):
+        """
+        Create a renderer that draws crossword cells as square tiles.
+        The font is loaded once, and each letter's tile is drawn the first
+        time it is needed and reused for every later grid.
+        """
+        from PIL import ImageFont
+        self.cell_size = cell_size
+        self.cell_border = cell_border
+        self.font = ImageFont.truetype(self.FONT, font_size)
+
+        # Tile for each letter, with None for an empty open cell
+        self.tiles = dict()
+
+    def tile(self, letter):
+        """
+        Return the tile of an open cell showing `letter` (or nothing,
+        if `letter` is None).
+        """
+        if letter in self.tiles:
+            return self.tiles[letter]
+
+        from PIL import Image, ImageDraw
+        interior_size = self.cell_size - 2 * self.cell_border
+        tile = Image.new("RGBA", (self.cell_size, self.cell_size), "black")
+        draw = ImageDraw.Draw(tile)
+        draw.rectangle(
+            [(self.cell_border, self.cell_border),
+             (self.cell_size - self.cell_border,
+              self.cell_size - self.cell_border)],
+            fill="white"
+        )
+        if letter:
+            _, _, w, h = draw.textbbox((0, 0), letter, font=self.font)
+            draw.text(
+                (self.cell_border + ((interior_size - w) / 2),
+                 self.cell_border + ((interior_size - h) / 2) - 10),
+                letter, fill="black", font=self.font
+            )
+
+        self.tiles[letter] = tile
+        return tile
+
+    def image(self, crossword, letters):
+        """
+        Return an image of `crossword` filled with the 2D array `letters`.
+        """
+        from PIL import Image
+        img = Image.new(
+            "RGBA",
+            (crossword.width * self.cell_size,
+             crossword.height * self.cell_size),
+            "black"
+        )
+        for i in range(crossword.height):
+            for j in range(crossword.width):
+                if crossword.structure[i][j]:
+                    img.paste(
+                        self.tile(letters[i][j]),
+                        (j * self.cell_size, i * self.cell_size)
+                    )
+        return img
+
+    def save(self, crossword, letters, filename):
+        """
+        Save an image of `crossword` filled with `letters` to `filename`.
+        """
+        self.image(crossword, letters).save(filename)
+
+
+# Renderer shared by every save, created on first use
+_renderer = None
+
+
+def renderer():
+    """Return the shared renderer."""
+    global _renderer
+    if _renderer is None:
+        _renderer = Renderer()
+    return _renderer
+
+
+def save_all(creator, assignments, output_dir, prefix="crossword"):
+    """
+    Render every assignment of `creator`'s crossword into `output_dir`,
+    as `<prefix>-<n>.png`. Return the list of files written.
+    """
+    os.makedirs(output_dir, exist_ok=True)
+    shared = renderer()
+    filenames = []
+    for n, assignment in enumerate(assignments):
+        filename = os.path.join(output_dir, f"{prefix}-{n}.png")
+        shared.save(
+            creator.crossword, creator.letter_grid(assignment), filename
+        )
+        filenames.append(filename)
+    return filenames
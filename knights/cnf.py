@@ -0,0 +1,92 @@
+from logic import And, Biconditional, Implication, Not, Or, Symbol
+
+
+class CNF():
+    """
+    Conjunctive normal form of logical sentences, built with the Tseitin
+    encoding: every compound subsentence gets a fresh variable defined to be
+    equivalent to it, so the clause count stays linear in the sentence size.
+
+    Clauses are lists of DIMACS literals (see `sat.Solver`).
+    """
+
+    def __init__(self):
+        self.num_vars = 0
+        self.clauses = []
+
+        # Variable of each symbol name, and the reverse mapping
+        self.variables = dict()
+        self.names = dict()
+
+        # Literal already defined for each encoded subsentence
+        self.literals = dict()
+
+    def variable(self, name):
+        """Return the variable of the symbol called `name`."""
+        if name not in self.variables:
+            self.num_vars += 1
+            self.variables[name] = self.num_vars
+            self.names[self.num_vars] = name
+        return self.variables[name]
+
+    def add(self, sentence):
+        """Add clauses asserting that `sentence` is true."""
+        # Top-level conjunctions and disjunctions are asserted directly,
+        # without defining a variable for them
+        if isinstance(sentence, And):
+            for conjunct in sentence.conjuncts:
+                self.add(conjunct)
+        elif isinstance(sentence, Or):
+            self.clauses.append(
+                [self.literal(disjunct) for disjunct in sentence.disjuncts]
+            )
+        else:
+            self.clauses.append([self.literal(sentence)])
+
+    def literal(self, sentence):
+        """
+        Return a literal equivalent to `sentence`, adding the clauses that
+        define any new Tseitin variables.
+        """
+        if isinstance(sentence, Symbol):
+            return self.variable(sentence.name)
+        if isinstance(sentence, Not):
+            return -self.literal(sentence.operand)
+        if sentence in self.literals:
+            return self.literals[sentence]
+
+        if isinstance(sentence, And):
+            operands = [self.literal(c) for c in sentence.conjuncts]
+            if len(operands) == 1:
+                return operands[0]
+            t = self._fresh()
+            self.clauses.extend([-t, operand] for operand in operands)
+            self.clauses.append([t] + [-operand for operand in operands])
+        elif isinstance(sentence, Or):
+            operands = [self.literal(d) for d in sentence.disjuncts]
+            if len(operands) == 1:
+                return operands[0]
+            t = self._fresh()
+            self.clauses.extend([t, -operand] for operand in operands)
+            self.clauses.append([-t] + operands)
+        elif isinstance(sentence, Implication):
+            a = self.literal(sentence.antecedent)
+            c = self.literal(sentence.consequent)
+            t = self._fresh()
+            self.clauses.extend([[-t, -a, c], [t, a], [t, -c]])
+        elif isinstance(sentence, Biconditional):
+            a = self.literal(sentence.left)
+            b = self.literal(sentence.right)
+            t = self._fresh()
+            self.clauses.extend(
+                [[-t, -a, b], [-t, a, -b], [t, a, b], [t, -a, -b]]
+            )
+        else:
+            raise TypeError(f"cannot encode {sentence!r}")
+
+        self.literals[sentence] = t
+        return t
+
+    def _fresh(self):
+        self.num_vars += 1
+        return self.num_vars
@@ -0,0 +1,187 @@
+import itertools
+
+from cnf import CNF
+
+
+def count_models(knowledge, symbols=None):
+    """
+    Returns the number of models of the knowledge base over `symbols`
+    (by default, the symbols of the knowledge base itself).
+
+    Counting runs a DPLL search over the Tseitin encoding of the knowledge
+    base that splits the clauses into independent components and caches
+    the count of every component it has seen. Tseitin variables are
+    determined by the symbols, so they do not change the count.
+    """
+    cnf, extra = _encode(knowledge, symbols)
+    clauses = frozenset(frozenset(clause) for clause in cnf.clauses)
+    return _count(clauses, dict()) << len(extra)
+
+
+def iter_models(knowledge, symbols=None):
+    """
+    Yields every model of the knowledge base over `symbols` (by default,
+    the symbols of the knowledge base itself) as a dict from symbol name
+    to bool, one at a time.
+    """
+    cnf, extra = _encode(knowledge, symbols)
+    names = sorted(cnf.variables)
+    order = [cnf.variables[name] for name in names]
+
+    clauses = frozenset(frozenset(clause) for clause in cnf.clauses)
+    if frozenset() in clauses:
+        return
+    units = [next(iter(clause)) for clause in clauses if len(clause) == 1]
+    clauses, assigned = _propagate(clauses, units)
+    if clauses is None:
+        return
+
+    for values in _walk(clauses, order, assigned):
+        model = {name: values[var] for name, var in zip(names, order)}
+        for free in itertools.product([False, True], repeat=len(extra)):
+            model.update(zip(extra, free))
+            yield dict(model)
+
+
+def _encode(knowledge, symbols):
+    """
+    Returns the CNF of the knowledge base, and the sorted names in
+    `symbols` that do not occur in it.
+    """
+    known = knowledge.symbols()
+    if symbols is None:
+        symbols = known
+    symbols = {
+        symbol.name if hasattr(symbol, "name") else symbol
+        for symbol in symbols
+    }
+    if not known <= symbols:
+        raise ValueError("symbols must include every symbol in knowledge")
+
+    cnf = CNF()
+    cnf.add(knowledge)
+    return cnf, sorted(symbols - known)
+
+
+def _propagate(clauses, literals):
+    """
+    Assigns `literals` and everything they imply by unit propagation.
+    Returns the remaining clauses and the assignment as a dict from
+    variable to bool, or (None, None) on a conflict.
+    """
+    assigned = dict()
+    queue = list(literals)
+    while queue:
+        literal = queue.pop()
+        var = abs(literal)
+        if var in assigned:
+            if assigned[var] != (literal > 0):
+                return None, None
+            continue
+        assigned[var] = literal > 0
+
+        remaining = set()
+        for clause in clauses:
+            if literal in clause:
+                continue
+            if -literal in clause:
+                clause = clause - {-literal}
+                if not clause:
+                    return None, None
+                if len(clause) == 1:
+                    queue.append(next(iter(clause)))
+            remaining.add(clause)
+        clauses = frozenset(remaining)
+    return clauses, assigned
+
+
+def _variables(clauses):
+    return {abs(literal) for clause in clauses for literal in clause}
+
+
+def _components(clauses):
+    """Splits clauses into groups that share no variable."""
+    parent = dict()
+
+    def find(var):
+        while parent.setdefault(var, var) != var:
+            parent[var] = parent[parent[var]]
+            var = parent[var]
+        return var
+
+    for clause in clauses:
+        first = find(abs(next(iter(clause))))
+        for literal in clause:
+            parent[find(abs(literal))] = first
+
+    groups = dict()
+    for clause in clauses:
+        groups.setdefault(find(abs(next(iter(clause)))), []).append(clause)
+    return [frozenset(group) for group in groups.values()]
+
+
+def _count(clauses, cache):
+    """Returns the number of assignments to the variables of `clauses`
+    that satisfy all of them."""
+    if not clauses:
+        return 1
+    if frozenset() in clauses:
+        return 0
+    if clauses in cache:
+        return cache[clauses]
+
+    components = _components(clauses)
+    if len(components) > 1:
+        count = 1
+        for component in components:
+            count *= _count(component, cache)
+            if not count:
+                break
+        cache[clauses] = count
+        return count
+
+    # Branch on a forced variable if there is one, else the most frequent
+    unit = next((clause for clause in clauses if len(clause) == 1), None)
+    if unit is not None:
+        var = abs(next(iter(unit)))
+    else:
+        occurrences = dict()
+        for clause in clauses:
+            for literal in clause:
+                occurrences[abs(literal)] = occurrences.get(abs(literal), 0) + 1
+        var = max(occurrences, key=occurrences.get)
+
+    variables = len(_variables(clauses))
+    count = 0
+    for literal in (var, -var):
+        remaining, assigned = _propagate(clauses, [literal])
+        if remaining is None:
+            continue
+
+        # Variables that vanished without being assigned are unconstrained
+        free = variables - len(assigned) - len(_variables(remaining))
+        count += _count(remaining, cache) << free
+
+    cache[clauses] = count
+    return count
+
+
+def _walk(clauses, order, assigned, start=0):
+    """
+    Yields every assignment extending `assigned` that satisfies `clauses`,
+    branching only on the variables in `order`; the remaining (Tseitin)
+    variables follow from them by unit propagation.
+    """
+    while start < len(order) and order[start] in assigned:
+        start += 1
+    if start == len(order):
+        if not clauses:
+            yield assigned
+        return
+
+    var = order[start]
+    for literal in (var, -var):
+        remaining, implied = _propagate(clauses, [literal])
+        if remaining is None:
+            continue
+        yield from _walk(remaining, order, {**assigned, **implied}, start + 1)
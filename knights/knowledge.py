@@ -0,0 +1,61 @@
+from cnf import CNF
+from sat import Solver
+
+
+class KnowledgeBase():
+    """
+    Knowledge base kept in clause form inside one incremental SAT solver.
+
+    Sentences may be added at any time, and each entailment query is a
+    solve under an assumption, so clauses learned while answering one
+    query speed up the next.
+    """
+
+    def __init__(self, *sentences):
+        self.cnf = CNF()
+        self.solver = Solver()
+
+        # Number of CNF clauses already handed to the solver
+        self.synced = 0
+
+        # Models of the knowledge base found so far, as solver assignments;
+        # a query false in any of them is not entailed
+        self.models = []
+
+        for sentence in sentences:
+            self.add(sentence)
+
+    def add(self, sentence):
+        """Adds a sentence to the knowledge base."""
+        self.cnf.add(sentence)
+        self._sync()
+        self.models.clear()
+
+    def satisfiable(self):
+        """Returns True if the knowledge base has a model."""
+        if self.models:
+            return True
+        if self.solver.solve():
+            self.models.append(self.solver.model)
+            return True
+        return False
+
+    def entails(self, query):
+        """Checks if the knowledge base entails query."""
+        literal = self.cnf.literal(query)
+        self._sync()
+
+        # Definitions of new Tseitin variables were not part of older models
+        var = abs(literal)
+        for model in self.models:
+            if var in model and model[var] != (literal > 0):
+                return False
+
+        if self.solver.solve([-literal]):
+            self.models.append(self.solver.model)
+            return False
+        return True
+
+    def _sync(self):
+        self.solver.add_clauses(self.cnf.clauses[self.synced:])
+        self.synced = len(self.cnf.clauses)
@@ -1,7 +1,58 @@
+import functools
 import itertools
+import weakref
 
 
 class Sentence():
+    """
+    Sentences other than And are immutable and hash-consed: constructing
+    one equal to a sentence that is still alive returns that same object,
+    so identical subterms are shared, and hashes and symbol sets are
+    computed once.
+
+    And is the exception, since `add` extends it in place: every And is
+    a separate object, and extending one invalidates the cached hashes and
+    symbol sets of all sentences, which may contain it.
+    """
+
+    # Live sentences, keyed by type and the identities of their parts
+    _interned = weakref.WeakValueDictionary()
+
+    # Incremented by And.add; caches computed in an older version are stale
+    _version = 0
+
+    _hash = None
+    _symbols = None
+    _cached = -1
+
+    @classmethod
+    def intern(cls, key, **fields):
+        """Returns the live sentence for `key`, creating it if needed."""
+        sentence = Sentence._interned.get(key)
+        if sentence is None:
+            sentence = cls.create(**fields)
+            Sentence._interned[key] = sentence
+        return sentence
+
+    @classmethod
+    def create(cls, **fields):
+        """Returns a new sentence with `fields`, without interning it."""
+        sentence = object.__new__(cls)
+        sentence.__dict__.update(fields)
+        return sentence
+
+    def _refresh(self):
+        if self._cached != Sentence._version:
+            self._hash = self._compute_hash()
+            self._symbols = None
+            self._cached = Sentence._version
+
+    def __hash__(self):
+        self._refresh()
+        return self._hash
+
+    def _compute_hash(self):
+        return object.__hash__(self)
 
     def evaluate(self, model):
         """Evaluates the logical sentence."""
@@ -13,7 +64,13 @@ class Sentence():
 
     def symbols(self):
         """Returns a set of all symbols in the logical sentence."""
-        return set()
+        self._refresh()
+        if self._symbols is None:
+            self._symbols = self._compute_symbols()
+        return self._symbols
+
+    def _compute_symbols(self):
+        return frozenset()
 
     @classmethod
     def validate(cls, sentence):
@@ -44,14 +101,22 @@ class Sentence():
 
 class Symbol(Sentence):
 
-    def __init__(self, name):
-        self.name = name
+    def __new__(cls, name):
+        return cls.intern(("symbol", name), name=name)
+
+    def __reduce__(self):
+        return (Symbol, (self.name,))
 
     def __eq__(self, other):
-        return isinstance(other, Symbol) and self.name == other.name
+        return self is other or (
+            isinstance(other, Symbol) and self.name == other.name
+        )
 
     def __hash__(self):
-        return hash(("symbol", self.name))
+        # Symbols never change, so their hash is never stale
+        if self._hash is None:
+            self._hash = hash(("symbol", self.name))
+        return self._hash
 
     def __repr__(self):
         return self.name
@@ -66,18 +131,27 @@ class Symbol(Sentence):
         return self.name
 
     def symbols(self):
-        return {self.name}
+        if self._symbols is None:
+            self._symbols = frozenset([self.name])
+        return self._symbols
 
 
 class Not(Sentence):
-    def __init__(self, operand):
+    def __new__(cls, operand):
         Sentence.validate(operand)
-        self.operand = operand
+        return cls.intern(("not", id(operand)), operand=operand)
+
+    def __reduce__(self):
+        return (Not, (self.operand,))
 
     def __eq__(self, other):
-        return isinstance(other, Not) and self.operand == other.operand
+        return self is other or (
+            isinstance(other, Not) and self.operand == other.operand
+        )
 
-    def __hash__(self):
+    __hash__ = Sentence.__hash__
+
+    def _compute_hash(self):
         return hash(("not", hash(self.operand)))
 
     def __repr__(self):
@@ -94,15 +168,22 @@ class Not(Sentence):
 
 
 class And(Sentence):
-    def __init__(self, *conjuncts):
+    def __new__(cls, *conjuncts):
         for conjunct in conjuncts:
             Sentence.validate(conjunct)
-        self.conjuncts = list(conjuncts)
+        return cls.create(conjuncts=tuple(conjuncts))
+
+    def __reduce__(self):
+        return (And, self.conjuncts)
 
     def __eq__(self, other):
-        return isinstance(other, And) and self.conjuncts == other.conjuncts
+        return self is other or (
+            isinstance(other, And) and self.conjuncts == other.conjuncts
+        )
 
-    def __hash__(self):
+    __hash__ = Sentence.__hash__
+
+    def _compute_hash(self):
         return hash(
             ("and", tuple(hash(conjunct) for conjunct in self.conjuncts))
         )
@@ -114,8 +195,10 @@ class And(Sentence):
         return f"And({conjunctions})"
 
     def add(self, conjunct):
+        """Adds a conjunct to this conjunction, in place."""
         Sentence.validate(conjunct)
-        self.conjuncts.append(conjunct)
+        self.conjuncts = self.conjuncts + (conjunct,)
+        Sentence._version += 1
 
     def evaluate(self, model):
         return all(conjunct.evaluate(model) for conjunct in self.conjuncts)
@@ -126,20 +209,32 @@ class And(Sentence):
         return " ∧ ".join([Sentence.parenthesize(conjunct.formula())
                            for conjunct in self.conjuncts])
 
-    def symbols(self):
-        return set.union(*[conjunct.symbols() for conjunct in self.conjuncts])
+    def _compute_symbols(self):
+        return frozenset().union(
+            *[conjunct.symbols() for conjunct in self.conjuncts]
+        )
 
 
 class Or(Sentence):
-    def __init__(self, *disjuncts):
+    def __new__(cls, *disjuncts):
         for disjunct in disjuncts:
             Sentence.validate(disjunct)
-        self.disjuncts = list(disjuncts)
+        return cls.intern(
+            ("or",) + tuple(id(disjunct) for disjunct in disjuncts),
+            disjuncts=tuple(disjuncts)
+        )
+
+    def __reduce__(self):
+        return (Or, self.disjuncts)
 
     def __eq__(self, other):
-        return isinstance(other, Or) and self.disjuncts == other.disjuncts
+        return self is other or (
+            isinstance(other, Or) and self.disjuncts == other.disjuncts
+        )
 
-    def __hash__(self):
+    __hash__ = Sentence.__hash__
+
+    def _compute_hash(self):
         return hash(
             ("or", tuple(hash(disjunct) for disjunct in self.disjuncts))
         )
@@ -157,23 +252,34 @@ class Or(Sentence):
         return " ∨  ".join([Sentence.parenthesize(disjunct.formula())
                             for disjunct in self.disjuncts])
 
-    def symbols(self):
-        return set.union(*[disjunct.symbols() for disjunct in self.disjuncts])
+    def _compute_symbols(self):
+        return frozenset().union(
+            *[disjunct.symbols() for disjunct in self.disjuncts]
+        )
 
 
 class Implication(Sentence):
-    def __init__(self, antecedent, consequent):
+    def __new__(cls, antecedent, consequent):
         Sentence.validate(antecedent)
         Sentence.validate(consequent)
-        self.antecedent = antecedent
-        self.consequent = consequent
+        return cls.intern(
+            ("implies", id(antecedent), id(consequent)),
+            antecedent=antecedent, consequent=consequent
+        )
+
+    def __reduce__(self):
+        return (Implication, (self.antecedent, self.consequent))
 
     def __eq__(self, other):
-        return (isinstance(other, Implication)
-                and self.antecedent == other.antecedent
-                and self.consequent == other.consequent)
+        return self is other or (
+            isinstance(other, Implication)
+            and self.antecedent == other.antecedent
+            and self.consequent == other.consequent
+        )
 
-    def __hash__(self):
+    __hash__ = Sentence.__hash__
+
+    def _compute_hash(self):
         return hash(("implies", hash(self.antecedent), hash(self.consequent)))
 
     def __repr__(self):
@@ -188,23 +294,31 @@ class Implication(Sentence):
         consequent = Sentence.parenthesize(self.consequent.formula())
         return f"{antecedent} => {consequent}"
 
-    def symbols(self):
-        return set.union(self.antecedent.symbols(), self.consequent.symbols())
+    def _compute_symbols(self):
+        return self.antecedent.symbols() | self.consequent.symbols()
 
 
 class Biconditional(Sentence):
-    def __init__(self, left, right):
+    def __new__(cls, left, right):
         Sentence.validate(left)
         Sentence.validate(right)
-        self.left = left
-        self.right = right
+        return cls.intern(
+            ("biconditional", id(left), id(right)), left=left, right=right
+        )
+
+    def __reduce__(self):
+        return (Biconditional, (self.left, self.right))
 
     def __eq__(self, other):
-        return (isinstance(other, Biconditional)
-                and self.left == other.left
-                and self.right == other.right)
+        return self is other or (
+            isinstance(other, Biconditional)
+            and self.left == other.left
+            and self.right == other.right
+        )
 
-    def __hash__(self):
+    __hash__ = Sentence.__hash__
+
+    def _compute_hash(self):
         return hash(("biconditional", hash(self.left), hash(self.right)))
 
     def __repr__(self):
@@ -221,43 +335,209 @@ class Biconditional(Sentence):
         right = Sentence.parenthesize(str(self.right))
         return f"{left} <=> {right}"
 
-    def symbols(self):
-        return set.union(self.left.symbols(), self.right.symbols())
+    def _compute_symbols(self):
+        return self.left.symbols() | self.right.symbols()
 
 
-def model_check(knowledge, query):
-    """Checks if knowledge base entails query."""
+# Number of symbols model_check evaluates at once, as 2^12 models per step
+BLOCK_SYMBOLS = 12
 
-    def check_all(knowledge, query, symbols, model):
-        """Checks if knowledge base entails query, given a particular model."""
 
-        # If model has an assignment for each symbol
-        if not symbols:
+def compile_sentence(sentence, symbols):
+    """
+    Compiles a logical sentence into a bit-parallel evaluator.
 
-            # If knowledge base is true in model, then query must also be true
-            if knowledge.evaluate(model):
-                return query.evaluate(model)
-            return True
-        else:
+    The evaluator takes a list with one column per symbol in `symbols` and
+    an all-ones `mask`. Bit m of a column is the value of that symbol in
+    the m-th model; bit m of the result is the sentence's value there.
+    """
+    return _compile(_structure(sentence, dict()), tuple(symbols))
 
-            # Choose one of the remaining unused symbols
-            remaining = symbols.copy()
-            p = remaining.pop()
 
-            # Create a model where the symbol is true
-            model_true = model.copy()
-            model_true[p] = True
+def _structure(sentence, seen):
+    """
+    Returns the sentence as nested tuples, which unlike an And cannot
+    change later, so compiled evaluators can be cached by it. Subterms
+    shared in the sentence are the same tuple in the result.
+    """
+    if id(sentence) in seen:
+        return seen[id(sentence)]
+    if isinstance(sentence, Symbol):
+        structure = ("symbol", sentence.name)
+    elif isinstance(sentence, Not):
+        structure = ("not", _structure(sentence.operand, seen))
+    elif isinstance(sentence, And):
+        structure = ("and",) + tuple(
+            _structure(conjunct, seen) for conjunct in sentence.conjuncts
+        )
+    elif isinstance(sentence, Or):
+        structure = ("or",) + tuple(
+            _structure(disjunct, seen) for disjunct in sentence.disjuncts
+        )
+    elif isinstance(sentence, Implication):
+        structure = ("implies", _structure(sentence.antecedent, seen),
+                     _structure(sentence.consequent, seen))
+    elif isinstance(sentence, Biconditional):
+        structure = ("biconditional", _structure(sentence.left, seen),
+                     _structure(sentence.right, seen))
+    else:
+        raise TypeError("must be a logical sentence")
+    seen[id(sentence)] = structure
+    return structure
+
+
+@functools.lru_cache(maxsize=256)
+def _compile(structure, symbols):
+    index = {symbol: k for k, symbol in enumerate(symbols)}
+    lines = []
+
+    # Temporary holding each subterm already emitted, by identity
+    names = dict()
+
+    def emit(node):
+        if id(node) in names:
+            return names[id(node)]
+        kind, *parts = node
+        if kind == "symbol":
+            try:
+                return f"columns[{index[parts[0]]}]"
+            except KeyError:
+                raise Exception(f"variable {parts[0]} not in model")
+        if kind == "not":
+            code = f"mask ^ {emit(parts[0])}"
+        elif kind == "and":
+            code = " & ".join(["mask"] + [emit(part) for part in parts])
+        elif kind == "or":
+            code = " | ".join(["0"] + [emit(part) for part in parts])
+        elif kind == "implies":
+            code = f"(mask ^ {emit(parts[0])}) | {emit(parts[1])}"
+        else:
+            code = f"mask ^ {emit(parts[0])} ^ {emit(parts[1])}"
+        name = f"t{len(lines)}"
+        lines.append(f"    {name} = {code}")
+        names[id(node)] = name
+        return name
 
-            # Create a model where the symbol is false
-            model_false = model.copy()
-            model_false[p] = False
+    result = emit(structure)
+    source = "\n".join(
+        ["def evaluate(columns, mask):"] + lines + [f"    return {result}"]
+    )
+    namespace = dict()
+    exec(source, namespace)
+    return namespace["evaluate"]
 
-            # Ensure entailment holds in both models
-            return (check_all(knowledge, query, remaining, model_true) and
-                    check_all(knowledge, query, remaining, model_false))
 
-    # Get all symbols in both knowledge and query
-    symbols = set.union(knowledge.symbols(), query.symbols())
+def model_check(knowledge, query):
+    """Checks if knowledge base entails query."""
 
-    # Check that knowledge entails query
-    return check_all(knowledge, query, symbols, dict())
+    # Get all symbols in both knowledge and query
+    symbols = sorted(knowledge.symbols() | query.symbols())
+
+    return find_counter_model(knowledge, query, symbols) is None
+
+
+def find_counter_model(knowledge, query, symbols,
+                       prefix=0, split=0, stop=None):
+    """
+    Returns a model (a dict from symbol name to bool) in which the knowledge
+    base is true but the query is false, or None if there is none.
+
+    The last `split` symbols (enumerated after the bit-parallel block) are
+    fixed to the bits of `prefix`, so disjoint prefixes cover disjoint
+    parts of the model space. The search gives up, returning None, once
+    `stop` is set.
+    """
+
+    # Models where the knowledge base holds but the query does not
+    counter_models = compile_sentence(And(knowledge, Not(query)), symbols)
+
+    # The first `width` symbols are enumerated in parallel, as the bits of
+    # one integer; the rest are enumerated one assignment at a time
+    width = min(len(symbols), BLOCK_SYMBOLS)
+    mask = (1 << (1 << width)) - 1
+    columns = [
+        (mask // ((1 << (1 << k)) + 1)) << (1 << k)
+        for k in range(width)
+    ]
+    rest = len(symbols) - width
+    free = rest - split
+
+    for low in range(1 << free):
+        if stop is not None and low % 64 == 0 and stop.is_set():
+            return None
+        high = prefix << free | low
+        columns[width:] = [
+            mask if high >> k & 1 else 0 for k in range(rest)
+        ]
+        found = counter_models(columns, mask)
+        if found:
+            m = (found & -found).bit_length() - 1
+            model = {symbols[k]: bool(m >> k & 1) for k in range(width)}
+            model.update(
+                (symbols[width + k], bool(high >> k & 1)) for k in range(rest)
+            )
+            return model
+    return None
+
+
+# Shared by the worker processes of parallel_model_check
+_check = None
+
+
+def _init_check(knowledge, query, symbols, split, stop):
+    global _check
+    _check = (knowledge, query, symbols, split, stop)
+
+
+def _check_prefix(prefix):
+    knowledge, query, symbols, split, stop = _check
+    model = find_counter_model(
+        knowledge, query, symbols, prefix=prefix, split=split, stop=stop
+    )
+    if model is not None:
+        stop.set()
+    return model
+
+
+def parallel_model_check(knowledge, query, split=None, processes=None):
+    """
+    Checks if knowledge base entails query, enumerating all models across
+    worker processes, each one fixing the values of the last `split`
+    symbols. Like model_check, it enumerates the knowledge base as given.
+    Every worker stops as soon as one of them finds a counter-model.
+
+    Returns (True, None) if the query is entailed, and (False, model) with
+    a counter-model otherwise.
+    """
+    import multiprocessing
+
+    symbols = sorted(knowledge.symbols() | query.symbols())
+    if processes is None:
+        processes = multiprocessing.cpu_count()
+    rest = max(len(symbols) - BLOCK_SYMBOLS, 0)
+    if split is None:
+        split = (4 * processes - 1).bit_length()
+    split = min(split, rest)
+
+    if split == 0:
+        model = find_counter_model(knowledge, query, symbols)
+        return model is None, model
+
+    stop = multiprocessing.Event()
+    with multiprocessing.Pool(
+        processes, initializer=_init_check,
+        initargs=(knowledge, query, symbols, split, stop)
+    ) as pool:
+        for model in pool.imap_unordered(_check_prefix, range(1 << split)):
+            if model is not None:
+                return False, model
+    return True, None
+
+
+def sat_check(knowledge, query):
+    """
+    Checks if knowledge base entails query, by asking a SAT solver whether
+    knowledge ∧ ¬query is unsatisfiable. Agrees with model_check.
+    """
+    from knowledge import KnowledgeBase
+    return KnowledgeBase(knowledge).entails(query)
@@ -0,0 +1,352 @@
+import heapq
+
+
+class Solver():
+    """
+    CDCL satisfiability solver over clauses in DIMACS form: a variable is a
+    positive integer, and a literal is a variable or its negation.
+
+    Clauses may be added between calls to `solve`, and every call may be
+    made under a list of assumed literals; learned clauses are kept, so
+    repeated queries reuse the work of earlier ones. Once there are more
+    than `learnt_limit` of them, the half with the highest LBD (the number
+    of decision levels among their literals) is deleted at the next
+    restart, except for clauses with an LBD of 2 or less.
+    """
+
+    DECAY = 0.95
+    RESTART_BASE = 100
+    RESTART_GROWTH = 1.5
+    REDUCE_BASE = 1000
+    REDUCE_GROWTH = 1.1
+    GLUE = 2
+
+    def __init__(self):
+        self.num_vars = 0
+        self.clauses = []
+
+        # LBD of each learned clause, 0 for the clauses that were added
+        self.lbd = []
+        self.learnt_limit = self.REDUCE_BASE
+
+        # Per variable (index 0 unused): value (1 true, -1 false, 0 unset),
+        # decision level, reason clause index, activity and saved phase
+        self.assigns = [0]
+        self.levels = [0]
+        self.reasons = [None]
+        self.activity = [0.0]
+        self.phases = [False]
+
+        # Clause indices watching each literal, see `_index`
+        self.watches = [[], []]
+
+        self.trail = []
+        self.trail_lim = []
+        self.qhead = 0
+
+        self.increment = 1.0
+        self.order = []
+        self.unsat = False
+        self.model = None
+
+    @staticmethod
+    def _index(literal):
+        return 2 * literal if literal > 0 else -2 * literal + 1
+
+    def reserve(self, num_vars):
+        """Make sure variables 1 through `num_vars` exist."""
+        while self.num_vars < num_vars:
+            self.num_vars += 1
+            self.assigns.append(0)
+            self.levels.append(0)
+            self.reasons.append(None)
+            self.activity.append(0.0)
+            self.phases.append(False)
+            self.watches.append([])
+            self.watches.append([])
+            heapq.heappush(self.order, (-0.0, self.num_vars))
+
+    def value(self, literal):
+        """Return 1 if `literal` is true, -1 if false, 0 if unassigned."""
+        value = self.assigns[abs(literal)]
+        return value if literal > 0 else -value
+
+    def add_clause(self, literals):
+        """
+        Add a clause. Return False if the clause set is now unsatisfiable.
+        """
+        if self.unsat:
+            return False
+        self._cancel(0)
+        self.reserve(max((abs(literal) for literal in literals), default=0))
+
+        clause = []
+        for literal in literals:
+            value = self.value(literal)
+            if value == 1 or -literal in clause:
+                return True
+            if value == 0 and literal not in clause:
+                clause.append(literal)
+
+        if not clause:
+            self.unsat = True
+        elif len(clause) == 1:
+            self._enqueue(clause[0], None)
+            if self._propagate() is not None:
+                self.unsat = True
+        else:
+            self._attach(clause, 0)
+        return not self.unsat
+
+    def add_clauses(self, clauses):
+        """Add every clause in `clauses`."""
+        for clause in clauses:
+            self.add_clause(clause)
+        return not self.unsat
+
+    def solve(self, assumptions=()):
+        """
+        Return True if the clauses are satisfiable with every literal in
+        `assumptions` true, storing a satisfying assignment in `self.model`
+        as a mapping from variable to bool; return False otherwise.
+        """
+        self.model = None
+        if self.unsat:
+            return False
+        self._cancel(0)
+        self.reserve(max((abs(literal) for literal in assumptions), default=0))
+        if self._propagate() is not None:
+            self.unsat = True
+            return False
+        self._reduce()
+
+        conflicts = 0
+        restart_limit = self.RESTART_BASE
+        while True:
+            conflict = self._propagate()
+            if conflict is not None:
+                if not self.trail_lim:
+                    self.unsat = True
+                    return False
+                conflicts += 1
+                learnt, level = self._analyze(conflict)
+                lbd = len({self.levels[abs(literal)] for literal in learnt})
+                self._cancel(level)
+                if len(learnt) == 1:
+                    self._enqueue(learnt[0], None)
+                else:
+                    self._enqueue(learnt[0], self._attach(learnt, lbd))
+                self.increment /= self.DECAY
+                continue
+
+            if conflicts >= restart_limit:
+                conflicts = 0
+                restart_limit = int(restart_limit * self.RESTART_GROWTH)
+                self._cancel(0)
+                self._reduce()
+                continue
+
+            # Assumptions are decided first, one per decision level
+            decision = None
+            while len(self.trail_lim) < len(assumptions):
+                literal = assumptions[len(self.trail_lim)]
+                value = self.value(literal)
+                if value == 1:
+                    self.trail_lim.append(len(self.trail))
+                elif value == -1:
+                    self._cancel(0)
+                    return False
+                else:
+                    decision = literal
+                    break
+
+            if decision is None:
+                var = self._pick()
+                if var is None:
+                    self.model = {
+                        var: self.assigns[var] == 1
+                        for var in range(1, self.num_vars + 1)
+                    }
+                    self._cancel(0)
+                    return True
+                decision = var if self.phases[var] else -var
+
+            self.trail_lim.append(len(self.trail))
+            self._enqueue(decision, None)
+
+    def _attach(self, clause, lbd):
+        """
+        Store `clause`, watching its first two literals. `lbd` is 0 for an
+        added clause and the LBD of a learned one.
+        """
+        index = len(self.clauses)
+        self.clauses.append(clause)
+        self.lbd.append(lbd)
+        self.watches[self._index(clause[0])].append(index)
+        self.watches[self._index(clause[1])].append(index)
+        return index
+
+    def _reduce(self):
+        """
+        Delete the worse half of the learned clauses if there are more than
+        `learnt_limit`. Must be called at decision level 0, where no reason
+        clause is needed for conflict analysis.
+        """
+        learnts = [
+            index for index, lbd in enumerate(self.lbd) if lbd > self.GLUE
+        ]
+        if len(learnts) <= self.learnt_limit:
+            return
+        self.learnt_limit = int(self.learnt_limit * self.REDUCE_GROWTH)
+
+        # Highest LBD first, and older first among equal LBDs
+        learnts.sort(key=lambda index: (-self.lbd[index], index))
+        deleted = set(learnts[:len(learnts) // 2])
+
+        clauses, lbds = self.clauses, self.lbd
+        self.clauses, self.lbd = [], []
+        self.watches = [[] for _ in self.watches]
+        for index, clause in enumerate(clauses):
+            if index not in deleted:
+                self._attach(clause, lbds[index])
+        for literal in self.trail:
+            self.reasons[abs(literal)] = None
+
+    def _enqueue(self, literal, reason):
+        var = abs(literal)
+        self.assigns[var] = 1 if literal > 0 else -1
+        self.levels[var] = len(self.trail_lim)
+        self.reasons[var] = reason
+        self.trail.append(literal)
+
+    def _cancel(self, level):
+        """Undo every assignment above decision `level`."""
+        if len(self.trail_lim) <= level:
+            return
+        start = self.trail_lim[level]
+        for literal in self.trail[start:]:
+            var = abs(literal)
+            self.phases[var] = literal > 0
+            self.assigns[var] = 0
+            self.reasons[var] = None
+            heapq.heappush(self.order, (-self.activity[var], var))
+        del self.trail[start:]
+        del self.trail_lim[level:]
+        self.qhead = min(self.qhead, start)
+
+    def _propagate(self):
+        """
+        Propagate every pending assignment through the watched literals.
+        Return the index of a conflicting clause, or None.
+        """
+        assigns = self.assigns
+        clauses = self.clauses
+        watches = self.watches
+        trail = self.trail
+
+        def value(literal):
+            return assigns[literal] if literal > 0 else -assigns[-literal]
+
+        while self.qhead < len(trail):
+            false_literal = -trail[self.qhead]
+            self.qhead += 1
+            slot = self._index(false_literal)
+            watching = watches[slot]
+            kept = []
+
+            for position, index in enumerate(watching):
+                clause = clauses[index]
+                if clause[0] == false_literal:
+                    clause[0], clause[1] = clause[1], clause[0]
+                first = clause[0]
+                if value(first) == 1:
+                    kept.append(index)
+                    continue
+
+                # Look for a replacement watch among the other literals
+                for k in range(2, len(clause)):
+                    if value(clause[k]) != -1:
+                        clause[1], clause[k] = clause[k], false_literal
+                        watches[self._index(clause[1])].append(index)
+                        break
+                else:
+                    kept.append(index)
+                    if value(first) == -1:
+                        kept.extend(watching[position + 1:])
+                        watches[slot] = kept
+                        self.qhead = len(trail)
+                        return index
+                    self._enqueue(first, index)
+
+            watches[slot] = kept
+        return None
+
+    def _analyze(self, conflict):
+        """
+        Derive the first-UIP clause from the `conflict` clause. Return the
+        learned clause, asserting literal first, and the level to backjump to.
+        """
+        level = len(self.trail_lim)
+        learnt = [None]
+        seen = set()
+        pending = 0
+        literal = None
+        position = len(self.trail) - 1
+        clause = self.clauses[conflict]
+
+        while True:
+            for other in (clause if literal is None else clause[1:]):
+                var = abs(other)
+                if var not in seen and self.levels[var] > 0:
+                    seen.add(var)
+                    self._bump(var)
+                    if self.levels[var] >= level:
+                        pending += 1
+                    else:
+                        learnt.append(other)
+
+            while abs(self.trail[position]) not in seen:
+                position -= 1
+            literal = self.trail[position]
+            position -= 1
+            pending -= 1
+            if pending == 0:
+                break
+            clause = self.clauses[self.reasons[abs(literal)]]
+
+        learnt[0] = -literal
+        if len(learnt) == 1:
+            return learnt, 0
+
+        # Watch the literal of the highest remaining level second
+        highest = max(
+            range(1, len(learnt)), key=lambda k: self.levels[abs(learnt[k])]
+        )
+        learnt[1], learnt[highest] = learnt[highest], learnt[1]
+        return learnt, self.levels[abs(learnt[1])]
+
+    def _bump(self, var):
+        self.activity[var] += self.increment
+        if self.activity[var] > 1e100:
+            for other in range(1, self.num_vars + 1):
+                self.activity[other] *= 1e-100
+            self.increment *= 1e-100
+            self.order = [
+                (-self.activity[other], other)
+                for other in range(1, self.num_vars + 1)
+                if self.assigns[other] == 0
+            ]
+            heapq.heapify(self.order)
+        elif self.assigns[var] == 0:
+            heapq.heappush(self.order, (-self.activity[var], var))
+
+    def _pick(self):
+        """Return the unassigned variable with the highest activity."""
+        while self.order:
+            activity, var = heapq.heappop(self.order)
+            if self.assigns[var] == 0 and -activity == self.activity[var]:
+                return var
+        for var in range(1, self.num_vars + 1):
+            if self.assigns[var] == 0:
+                return var
+        return None
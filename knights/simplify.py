@@ -0,0 +1,183 @@
+from logic import (And, Biconditional, Implication, Not, Or, Symbol,
+                   find_counter_model)
+
+# Constant sentences, the empty conjunction and the empty disjunction,
+# made outside the intern table so that no constructor returns them and
+# they can be recognized by identity
+_TRUE = And.create(conjuncts=())
+_FALSE = Or.create(disjuncts=())
+
+
+def size(sentence):
+    """Returns the number of nodes in the tree of a sentence."""
+    if isinstance(sentence, Symbol):
+        return 1
+    if isinstance(sentence, Not):
+        return 1 + size(sentence.operand)
+    if isinstance(sentence, And):
+        return 1 + sum(size(conjunct) for conjunct in sentence.conjuncts)
+    if isinstance(sentence, Or):
+        return 1 + sum(size(disjunct) for disjunct in sentence.disjuncts)
+    if isinstance(sentence, Implication):
+        return 1 + size(sentence.antecedent) + size(sentence.consequent)
+    return 1 + size(sentence.left) + size(sentence.right)
+
+
+def simplify(sentence):
+    """
+    Returns an equivalent sentence with nested conjunctions and disjunctions
+    flattened, duplicates, double negations and tautologies removed, and
+    every symbol fixed by a top-level fact replaced by its value, along
+    with the sizes of the sentence before and after.
+    """
+    facts = dict()
+    while True:
+        simplified = _simplify(sentence, facts)
+        new = [
+            literal for literal in _conjuncts(simplified)
+            if _literal(literal) is not None
+        ]
+        if not new:
+            break
+        for literal in new:
+            name, value = _literal(literal)
+            facts[name] = value
+
+    if simplified is not _FALSE:
+        simplified = _and([
+            Symbol(name) if value else Not(Symbol(name))
+            for name, value in facts.items()
+        ] + _conjuncts(simplified))
+
+    # Hand out fresh constants, which callers may extend
+    if simplified is _TRUE:
+        simplified = And()
+    elif simplified is _FALSE:
+        simplified = Or()
+    return simplified, size(sentence), size(simplified)
+
+
+def simplified_model_check(knowledge, query):
+    """
+    Checks if knowledge base entails query, like logic.model_check, but
+    enumerates the models of the simplified knowledge base.
+    """
+    knowledge, _, _ = simplify(knowledge)
+    symbols = sorted(knowledge.symbols() | query.symbols())
+    return find_counter_model(knowledge, query, symbols) is None
+
+
+def _simplify(sentence, facts):
+    """Simplifies a sentence, given the values of some symbols."""
+    if isinstance(sentence, Symbol):
+        if sentence.name in facts:
+            return _TRUE if facts[sentence.name] else _FALSE
+        return sentence
+    if isinstance(sentence, Not):
+        return _not(_simplify(sentence.operand, facts))
+    if isinstance(sentence, And):
+        return _and([_simplify(c, facts) for c in sentence.conjuncts])
+    if isinstance(sentence, Or):
+        return _or([_simplify(d, facts) for d in sentence.disjuncts])
+    if isinstance(sentence, Implication):
+        antecedent = _simplify(sentence.antecedent, facts)
+        consequent = _simplify(sentence.consequent, facts)
+        if antecedent is _FALSE or consequent is _TRUE:
+            return _TRUE
+        if antecedent is _TRUE:
+            return consequent
+        if consequent is _FALSE:
+            return _not(antecedent)
+        if (antecedent == consequent
+                or antecedent in _disjuncts(consequent)
+                or consequent in _conjuncts(antecedent)):
+            return _TRUE
+        if antecedent in _disjuncts(_not(consequent)):
+            return _not(antecedent)
+        return Implication(antecedent, consequent)
+    if isinstance(sentence, Biconditional):
+        left = _simplify(sentence.left, facts)
+        right = _simplify(sentence.right, facts)
+        if left is _TRUE:
+            return right
+        if right is _TRUE:
+            return left
+        if left is _FALSE:
+            return _not(right)
+        if right is _FALSE:
+            return _not(left)
+        if left == right:
+            return _TRUE
+        if left == _not(right):
+            return _FALSE
+        return Biconditional(left, right)
+    raise TypeError("must be a logical sentence")
+
+
+def _not(sentence):
+    if sentence is _TRUE:
+        return _FALSE
+    if sentence is _FALSE:
+        return _TRUE
+    if isinstance(sentence, Not):
+        return sentence.operand
+    return Not(sentence)
+
+
+def _and(conjuncts):
+    """Flattens, deduplicates and short-circuits a conjunction."""
+    flat = []
+    for conjunct in conjuncts:
+        if conjunct is _FALSE:
+            return _FALSE
+        flat.extend(_conjuncts(conjunct))
+    unique = list(dict.fromkeys(flat))
+    present = set(unique)
+    if any(_not(conjunct) in present for conjunct in unique):
+        return _FALSE
+    if not unique:
+        return _TRUE
+    if len(unique) == 1:
+        return unique[0]
+    return And(*unique)
+
+
+def _or(disjuncts):
+    """Flattens, deduplicates and short-circuits a disjunction."""
+    flat = []
+    for disjunct in disjuncts:
+        if disjunct is _TRUE:
+            return _TRUE
+        flat.extend(_disjuncts(disjunct))
+    unique = list(dict.fromkeys(flat))
+    present = set(unique)
+    if any(_not(disjunct) in present for disjunct in unique):
+        return _TRUE
+    if not unique:
+        return _FALSE
+    if len(unique) == 1:
+        return unique[0]
+    return Or(*unique)
+
+
+def _conjuncts(sentence):
+    """Returns the operands of a conjunction, or the sentence itself."""
+    if isinstance(sentence, And):
+        return list(sentence.conjuncts)
+    return [sentence]
+
+
+def _disjuncts(sentence):
+    """Returns the operands of a disjunction, or the sentence itself."""
+    if isinstance(sentence, Or):
+        return list(sentence.disjuncts)
+    return [sentence]
+
+
+def _literal(sentence):
+    """Returns (name, value) if the sentence is a literal, else None."""
+    if isinstance(sentence, Symbol):
+        return sentence.name, True
+    if isinstance(sentence, Not) and isinstance(sentence.operand, Symbol):
+        return sentence.operand.name, False
+    return None
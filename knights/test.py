@@ -0,0 +1,124 @@
+"""
+Randomized cross-checks of the SAT-based entailment check and the model
+counter.
+
+Builds random knowledge bases and queries over a few symbols and compares
+sat_check with model_check, and count_models and iter_models with the
+models found by trying every assignment.
+
+    python test.py --trials 1000
+"""
+import argparse
+import itertools
+import random
+import sys
+
+from counting import count_models, iter_models
+from logic import *
+
+
+def random_sentence(rng, symbols, depth=3):
+    """
+    Returns a random sentence over `symbols` nested at most `depth` deep,
+    including empty conjunctions and disjunctions.
+    """
+    if depth == 0 or rng.random() < 0.3:
+        return rng.choice(symbols)
+    kind = rng.randrange(5)
+    if kind == 0:
+        return Not(random_sentence(rng, symbols, depth - 1))
+    if kind == 1:
+        return And(*(
+            random_sentence(rng, symbols, depth - 1)
+            for _ in range(rng.randint(0, 3))
+        ))
+    if kind == 2:
+        return Or(*(
+            random_sentence(rng, symbols, depth - 1)
+            for _ in range(rng.randint(0, 3))
+        ))
+    if kind == 3:
+        return Implication(
+            random_sentence(rng, symbols, depth - 1),
+            random_sentence(rng, symbols, depth - 1)
+        )
+    return Biconditional(
+        random_sentence(rng, symbols, depth - 1),
+        random_sentence(rng, symbols, depth - 1)
+    )
+
+
+def random_knowledge(rng, symbols):
+    """Returns a random conjunction of a few random sentences."""
+    return And(*(
+        random_sentence(rng, symbols) for _ in range(rng.randint(1, 4))
+    ))
+
+
+def check_sat(rng, symbols, trials):
+    """
+    Compares sat_check with model_check on `trials` random knowledge bases
+    and queries. Returns the number of disagreements.
+    """
+    failures = 0
+    for _ in range(trials):
+        knowledge = random_knowledge(rng, symbols)
+        query = random_sentence(rng, symbols)
+        expected = model_check(knowledge, query)
+        if sat_check(knowledge, query) != expected:
+            print(f"sat_check disagrees: {knowledge.formula()} "
+                  f"entails {query.formula()} is {expected}")
+            failures += 1
+    return failures
+
+
+def check_counting(rng, symbols, trials):
+    """
+    Compares count_models and iter_models, over all of `symbols`, with
+    every assignment that satisfies `trials` random knowledge bases.
+    Returns the number of disagreements.
+    """
+    names = [symbol.name for symbol in symbols]
+    failures = 0
+    for _ in range(trials):
+        knowledge = random_knowledge(rng, symbols)
+        expected = set()
+        for values in itertools.product([False, True], repeat=len(names)):
+            model = dict(zip(names, values))
+            if knowledge.evaluate(model):
+                expected.add(frozenset(model.items()))
+
+        count = count_models(knowledge, symbols)
+        models = [
+            frozenset(model.items())
+            for model in iter_models(knowledge, symbols)
+        ]
+        if (count != len(expected) or len(models) != len(expected)
+                or set(models) != expected):
+            print(f"counting disagrees on {knowledge.formula()}: "
+                  f"{count} counted, {len(models)} enumerated, "
+                  f"{len(expected)} expected")
+            failures += 1
+    return failures
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--trials", type=int, default=500)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    symbols = [Symbol(name) for name in "ABCDE"]
+    failures = 0
+    for name, check in (("sat_check", check_sat),
+                        ("counting", check_counting)):
+        found = check(rng, symbols, args.trials)
+        print(f"{name}: {args.trials} trials, {found} disagreements")
+        failures += found
+    if failures:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,160 @@
+"""
+Linear-algebra deduction for Minesweeper knowledge.
+
+Every sentence is a linear equation over 0/1 variables, one per cell:
+the cells of the sentence sum to its count. Sentences are stored as
+bitmasks over the cells they mention, so that combining two of them is a
+few integer operations. Deduction uses bounds reasoning: if an equation
+can only hold with some variable at 0 (or 1), that cell is safe (or a
+mine). It is applied to every sentence, to the difference of every two
+overlapping sentences, which covers the subset rule, and to the rows of
+the reduced row echelon form of each group of connected sentences.
+"""
+import math
+
+
+def deduce(sentences):
+    """
+    Returns the sets of cells that `sentences`, (cells, count) pairs, prove
+    to be safe and to be mines.
+    """
+    cells = sorted(set().union(*(cells for cells, _ in sentences)))
+    bit = {cell: 1 << i for i, cell in enumerate(cells)}
+    rows = set()
+    for members, count in sentences:
+        mask = 0
+        for cell in members:
+            mask |= bit[cell]
+        rows.add((mask, count))
+
+    safe = mine = 0
+    while rows:
+        found_safe, found_mine = _bounds(rows)
+        if not found_safe and not found_mine:
+            for component in _components(rows):
+                s, m = _eliminate(component)
+                found_safe |= s
+                found_mine |= m
+        if not found_safe and not found_mine:
+            break
+        safe |= found_safe
+        mine |= found_mine
+
+        # Substitute what was found, dropping settled sentences
+        known = safe | mine
+        rows = {
+            (mask & ~known, count - (mask & mine).bit_count())
+            for mask, count in rows
+            if mask & ~known
+        }
+
+    return (
+        {cell for cell in cells if safe & bit[cell]},
+        {cell for cell in cells if mine & bit[cell]},
+    )
+
+
+def _bounds(rows):
+    """
+    Returns bitmasks of the cells fixed by a single sentence or by the
+    difference of two overlapping sentences.
+    """
+    safe = mine = 0
+    rows = list(rows)
+    for mask, count in rows:
+        if count == 0:
+            safe |= mask
+        elif count == mask.bit_count():
+            mine |= mask
+
+    for i, (a, a_count) in enumerate(rows):
+        for b, b_count in rows[i + 1:]:
+            if not a & b:
+                continue
+
+            # a - b: cells only in a count +1, cells only in b count -1
+            plus, minus = a & ~b, b & ~a
+            difference = a_count - b_count
+            if difference == plus.bit_count():
+                mine |= plus
+                safe |= minus
+            elif difference == -minus.bit_count():
+                safe |= plus
+                mine |= minus
+    return safe, mine
+
+
+def _components(rows):
+    """Splits sentences into groups that share no cell."""
+    groups = []
+    for row in rows:
+        mask = row[0]
+        group = [row]
+        for other in groups[:]:
+            if other[0] & mask:
+                mask |= other[0]
+                group.extend(other[1])
+                groups.remove(other)
+        groups.append((mask, group))
+    return [group for _, group in groups]
+
+
+def _eliminate(rows):
+    """
+    Brings the equations of one group of sentences into reduced row
+    echelon form with integer arithmetic, and returns bitmasks of the
+    cells fixed by bounds reasoning on any of its rows.
+    """
+    columns = []
+    mask = 0
+    for row, _ in rows:
+        mask |= row
+    while mask:
+        low = mask & -mask
+        columns.append(low)
+        mask ^= low
+
+    # Each equation as a list of coefficients with the count last
+    matrix = [
+        [1 if row & column else 0 for column in columns] + [count]
+        for row, count in rows
+    ]
+
+    pivot_row = 0
+    for c in range(len(columns)):
+        pivot = next(
+            (r for r in range(pivot_row, len(matrix)) if matrix[r][c]), None
+        )
+        if pivot is None:
+            continue
+        matrix[pivot_row], matrix[pivot] = matrix[pivot], matrix[pivot_row]
+        p = matrix[pivot_row]
+        for r in range(len(matrix)):
+            if r != pivot_row and matrix[r][c]:
+                f = matrix[r][c]
+                row = [x * p[c] - y * f for x, y in zip(matrix[r], p)]
+                divisor = math.gcd(*row)
+                matrix[r] = [x // divisor for x in row] if divisor > 1 else row
+        pivot_row += 1
+        if pivot_row == len(matrix):
+            break
+
+    safe = mine = 0
+    for row in matrix:
+        *coefficients, count = row
+        low = sum(a for a in coefficients if a < 0)
+        high = sum(a for a in coefficients if a > 0)
+        for a, column in zip(coefficients, columns):
+            if a > 0:
+                # Setting this variable to 1 (or 0) must leave the count
+                # within reach of the others
+                if low + a > count:
+                    safe |= column
+                elif high - a < count:
+                    mine |= column
+            elif a < 0:
+                if high + a < count:
+                    safe |= column
+                elif low - a > count:
+                    mine |= column
+    return safe, mine
@@ -1,6 +1,12 @@
 import itertools
+import logging
 import random
 
+from linear import deduce
+from probability import mine_probabilities
+
+logger = logging.getLogger(__name__)
+
 
 class Minesweeper():
     """
@@ -144,11 +150,12 @@ class MinesweeperAI():
     Minesweeper game player
     """
 
-    def __init__(self, height=8, width=8):
+    def __init__(self, height=8, width=8, mines=8):
 
-        # Set initial height and width
+        # Set initial height, width, and number of mines
         self.height = height
         self.width = width
+        self.total_mines = mines
 
         # Keep track of which cells have been clicked on
         self.moves_made = set()
@@ -157,117 +164,147 @@ class MinesweeperAI():
         self.mines = set()
         self.safes = set()
 
-        # List of sentences about the game known to be true
-        self.knowledge = []
+        # Sentences about the game known to be true, keyed by
+        # (frozenset of cells, count) so that no sentence is stored twice
+        self._sentences = dict()
+
+        # Keys of the sentences that mention each cell
+        self._index = dict()
+
+        # Keys of sentences added or changed since inference last ran
+        self._pending = []
+
+    @property
+    def knowledge(self):
+        """
+        List of sentences about the game known to be true.
+        """
+        return list(self._sentences.values())
 
     def mark_mine(self, cell):
         """
         Marks a cell as a mine, and updates all knowledge
         to mark that cell as a mine as well.
         """
+        if cell in self.mines:
+            return
         self.mines.add(cell)
-        for sentence in self.knowledge:
+        for key in self._index.pop(cell, set()):
+            sentence = self._remove(key)
             sentence.mark_mine(cell)
+            self._add(sentence.cells, sentence.count)
 
     def mark_safe(self, cell):
         """
         Marks a cell as safe, and updates all knowledge
         to mark that cell as safe as well.
         """
+        if cell in self.safes:
+            return
         self.safes.add(cell)
-        for sentence in self.knowledge:
+        for key in self._index.pop(cell, set()):
+            sentence = self._remove(key)
             sentence.mark_safe(cell)
+            self._add(sentence.cells, sentence.count)
 
-    
     def add_knowledge(self, cell, count):
-        # 1. Marcar la celda como un movimiento realizado y como segura
+        """
+        Called when the Minesweeper board tells us, for a given
+        safe cell, how many neighboring cells have mines in them.
+
+        Marks the cell as a move made and as safe, adds a sentence
+        about its undecided neighbors, and draws every conclusion
+        that follows from it. If that leaves no safe move, solves the
+        sentences together as a linear system (see linear.py).
+        """
         self.moves_made.add(cell)
         self.mark_safe(cell)
-        
-        # Create set to store undecided cells for KB:
-        new_sentence_cells = set()
-
-        
-        # Loop over all cells within one row and column
-        for i in range(cell[0] - 1, cell[0] + 2):
-            for j in range(cell[1] - 1, cell[1] + 2):
-
-                # Ignore the cell itself
-                if (i, j) == cell:
-                    continue
-
-                # If cells are already safe, ignore them:
-                if (i, j) in self.safes:
-                    continue
-
-                # If cells are known to be mines, reduce count by 1 and ignore them:
-                if (i, j) in self.mines:
-                    count = count - 1
-                    continue
-
-                # Otherwise add them to sentence if they are in the game board:
-                if 0 <= i < self.height and 0 <= j < self.width:
-                    new_sentence_cells.add((i, j))
-        
-        self.knowledge.append(Sentence(new_sentence_cells, count))
-
-        # Iterar sobre todas las sentencias para buscar posibles minas que puedan inferirse
-        for sentence in self.knowledge:
-            if len(sentence.cells) == sentence.count:
-                for cell in sentence.cells.copy():
-                    self.mark_mine(cell)
-
-        # Iterar sobre todas las sentencias para buscar posibles celdas seguras que puedan inferirse
-        for sentence in self.knowledge:
-            if sentence.count == 0:
-                for cell in sentence.cells.copy():
-                    self.mark_safe(cell)
-
+        self._add(self.get_neighbors(cell), count)
         self.update_knowledge()
 
-
-
-
+        # With no safe move left, try the stronger linear deduction
+        while self._sentences and not self.safes - self.moves_made:
+            safes, mines = deduce(self._sentences)
+            if not safes and not mines:
+                break
+            for cell in mines:
+                self.mark_mine(cell)
+            for cell in safes:
+                self.mark_safe(cell)
+            self.update_knowledge()
+
+        # Formatting the whole knowledge base is costly, so only do it
+        # when someone is listening
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("KNOWLEDGE BASE: %s",
+                         [str(sentence) for sentence in self.knowledge])
+            logger.debug("CELDAS SEGURAS: %s", [cell for cell in self.safes if cell not in self.moves_made])
+            logger.debug("MINAS: %s", list(self.mines))
 
     def update_knowledge(self):
-        # Verificar si alguna celda puede marcarse como segura o mina
-        for sentence in self.knowledge:
-            if sentence.count == 0:
-                for cell in sentence.cells:
-                    self.safes.add(cell)
-            elif sentence.count == len(sentence.cells):
-                for cell in sentence.cells:
-                    self.mines.add(cell)
-        
-        # Verificar si se pueden inferir nuevas sentencias
-        new_sentences = []
-        for sentence_1 in self.knowledge:
-            for sentence_2 in self.knowledge:
-                if sentence_1 != sentence_2:
-
-                    if sentence_1.cells.issubset(sentence_2.cells):
-                        new_cells = sentence_2.cells - sentence_1.cells
-                        new_count = sentence_2.count - sentence_1.count
-
-                        new_sentence = Sentence(new_cells, new_count)
-
-                        if new_sentence not in self.knowledge:
-                            new_sentences.append(new_sentence)
-        
-       
-        
-        # Remove any empty sentences from knowledge base:
-        empty = Sentence(set(), 0)
-
-        self.knowledge[:] = [x for x in self.knowledge if x != empty]
-
-        print(f"\nKNOWLEDGE BASE:{[(x.cells, x.count) for x in self.knowledge]}")
-        print(f"CELDAS SEGURAS: {[cell for cell in self.safes if cell not in self.moves_made]}")
-        print(f"MINAS: {[mine for mine in self.mines]}")
-
-        self.knowledge.extend(new_sentences)
-    
-    
+        """
+        Draws conclusions from pending sentences until nothing new
+        follows: a sentence whose count is 0 or equal to its size fixes
+        all its cells, and a sentence contained in another one gives
+        a sentence about their difference. Only sentences sharing a
+        cell with a pending sentence are compared to it.
+        """
+        while self._pending:
+            key = self._pending.pop()
+            if key not in self._sentences:
+                continue
+            sentence = self._sentences[key]
+
+            mines = sentence.known_mines()
+            safes = sentence.known_safes()
+            if mines or safes:
+                for cell in list(mines):
+                    self.mark_mine(cell)
+                for cell in list(safes):
+                    self.mark_safe(cell)
+                continue
+
+            cells, count = key
+            others = set()
+            for cell in cells:
+                others |= self._index[cell]
+            others.discard(key)
+            for other_cells, other_count in others:
+                if other_cells < cells:
+                    self._add(cells - other_cells, count - other_count)
+                elif cells < other_cells:
+                    self._add(other_cells - cells, other_count - count)
+
+    def _add(self, cells, count):
+        """
+        Adds the sentence that `count` of `cells` are mines, leaving out
+        cells already known to be safe or mines, unless it is empty or
+        already known.
+        """
+        cells = set(cells) - self.safes
+        count -= len(cells & self.mines)
+        cells -= self.mines
+        if not cells:
+            return
+
+        key = (frozenset(cells), count)
+        if key in self._sentences:
+            return
+        self._sentences[key] = Sentence(cells, count)
+        for cell in cells:
+            self._index.setdefault(cell, set()).add(key)
+        self._pending.append(key)
+
+    def _remove(self, key):
+        """Removes a sentence from the knowledge and returns it."""
+        sentence = self._sentences.pop(key)
+        for cell in key[0]:
+            keys = self._index.get(cell)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self._index[cell]
+        return sentence
 
     def get_neighbors(self, cell):
         # Devolver los vecinos de una celda dada
@@ -299,20 +336,24 @@ class MinesweeperAI():
     def make_random_move(self):
         """
         Returns a move to make on the Minesweeper board.
-        Should choose randomly among cells that:
+        Should choose among cells that:
             1) have not already been chosen, and
             2) are not known to be mines
+        picking at random among those least likely to be a mine.
         """
+        unknown = [
+            (i, j)
+            for i in range(self.height)
+            for j in range(self.width)
+            if (i, j) not in self.moves_made and (i, j) not in self.mines
+        ]
+        if not unknown:
+            return None
 
-        possibleMoves = []
-
-        for i in range(self.height):
-            for j in range(self.width):
-                if (i,j) not in self.moves_made and (i,j) not in self.mines:
-                    possibleMoves.append((i,j))
-        
-        if len(possibleMoves) != 0:
-            return random.choice(possibleMoves)
-        
-        return None
-                    
+        probabilities = mine_probabilities(
+            self._sentences, unknown, self.total_mines - len(self.mines)
+        )
+        lowest = min(probabilities.values())
+        return random.choice([
+            cell for cell in unknown if probabilities[cell] <= lowest + 1e-9
+        ])
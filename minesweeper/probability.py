@@ -0,0 +1,199 @@
+import math
+
+
+def mine_probabilities(sentences, unknown, mines):
+    """
+    Returns a dict from each cell in `unknown` to the probability that it
+    is a mine, given `sentences` as (cells, count) pairs over those cells
+    and the number of `mines` left among them, assuming every arrangement
+    consistent with all of that is equally likely.
+
+    The constrained cells are split into components that share no
+    sentence. Each component is counted separately, by mine total, and
+    the components are combined with the unconstrained cells by weighting
+    every total with the number of ways to place the remaining mines.
+    """
+    sentences = [(frozenset(cells), count) for cells, count in sentences]
+    constrained = set().union(*(cells for cells, _ in sentences))
+    free = len(set(unknown) - constrained)
+
+    # Number of solutions of each component by mine count, and of those
+    # with each cell a mine
+    totals = []
+    marginals = []
+    for component in _components(sentences):
+        total, cells = _count(component)
+        totals.append(total)
+        marginals.append(cells)
+
+    def weight(k):
+        rest = mines - k
+        return math.comb(free, rest) if 0 <= rest <= free else 0
+
+    combined = {0: 1}
+    for total in totals:
+        combined = _convolve(combined, total)
+    if not any(weight(k) for k in combined if combined[k]):
+        # The mine count contradicts the sentences: ignore it
+        def weight(k):
+            return 1
+    norm = sum(count * weight(k) for k, count in combined.items())
+    if not norm:
+        return {cell: mines / len(unknown) for cell in unknown}
+
+    probabilities = dict()
+    for c, cells in enumerate(marginals):
+        others = {0: 1}
+        for d, total in enumerate(totals):
+            if d != c:
+                others = _convolve(others, total)
+
+        # Weight of each mine count of this component, summed over the
+        # mine counts of the others
+        weights = {
+            k: sum(count * weight(k + j) for j, count in others.items())
+            for k in totals[c]
+        }
+        for cell, counts in cells.items():
+            probabilities[cell] = sum(
+                count * weights[k] for k, count in counts.items()
+            ) / norm
+
+    if free:
+        expected = sum(
+            count * weight(k) * (mines - k) for k, count in combined.items()
+        ) / norm
+        probability = min(1, max(0, expected / free))
+        for cell in unknown:
+            if cell not in constrained:
+                probabilities[cell] = probability
+    return probabilities
+
+
+def _components(sentences):
+    """Splits sentences into groups that share no cell."""
+    groups = []
+    owner = dict()
+    for sentence in sentences:
+        merged = {owner[cell] for cell in sentence[0] if cell in owner}
+        group = [sentence]
+        for index in merged:
+            group.extend(groups[index])
+            groups[index] = None
+        groups.append(group)
+        for cells, _ in group:
+            for cell in cells:
+                owner[cell] = len(groups) - 1
+    return [group for group in groups if group is not None]
+
+
+def _order(sentences):
+    """
+    Returns the cells of the sentences in breadth-first order through
+    shared sentences, which keeps few sentences open at a time.
+    """
+    by_cell = dict()
+    for cells, _ in sentences:
+        for cell in cells:
+            by_cell.setdefault(cell, []).append(cells)
+
+    order = []
+    seen = set()
+    for start in sorted(by_cell):
+        if start in seen:
+            continue
+        seen.add(start)
+        queue = [start]
+        while queue:
+            cell = queue.pop(0)
+            order.append(cell)
+            for cells in by_cell[cell]:
+                for other in sorted(cells):
+                    if other not in seen:
+                        seen.add(other)
+                        queue.append(other)
+    return order
+
+
+def _count(sentences):
+    """
+    Counts the mine arrangements of one component that satisfy all its
+    sentences. Returns a dict from mine count to number of arrangements,
+    and a dict from each cell to the same counts restricted to
+    arrangements where that cell is a mine.
+
+    Cells are assigned in order, and arrangements are merged whenever they
+    leave the same counts still to be placed in every sentence, so the
+    work grows with the number of such states rather than of arrangements.
+    A forward pass counts the ways to reach each state and a backward pass
+    the ways to finish from it.
+    """
+    cells = _order(sentences)
+    position = {cell: i for i, cell in enumerate(cells)}
+    touching = [[] for _ in cells]
+    for s, (members, _) in enumerate(sentences):
+        for cell in members:
+            touching[position[cell]].append(s)
+
+    # remaining[s][i]: cells of sentence s after position i
+    remaining = []
+    for members, _ in sentences:
+        indices = sorted(position[cell] for cell in members)
+        remaining.append([
+            sum(1 for index in indices if index > i) for i in range(len(cells))
+        ])
+
+    def step(state, i, mine):
+        state = list(state)
+        for s in touching[i]:
+            state[s] -= mine
+            if not 0 <= state[s] <= remaining[s][i]:
+                return None
+        return tuple(state)
+
+    start = tuple(count for _, count in sentences)
+    layers = [{start: {0: 1}}]
+    for i in range(len(cells)):
+        layer = dict()
+        for state, counts in layers[-1].items():
+            for mine in (0, 1):
+                following = step(state, i, mine)
+                if following is not None:
+                    target = layer.setdefault(following, dict())
+                    for k, count in counts.items():
+                        target[k + mine] = target.get(k + mine, 0) + count
+        layers.append(layer)
+
+    end = tuple(0 for _ in sentences)
+    total = layers[-1].get(end, dict())
+
+    # Backward pass: arrangements of the later cells from each state
+    after = {end: {0: 1}}
+    marginals = dict()
+    for i in range(len(cells) - 1, -1, -1):
+        before = dict()
+        mines = dict()
+        for state, counts in layers[i].items():
+            for mine in (0, 1):
+                following = step(state, i, mine)
+                if following not in after:
+                    continue
+                ways = after[following]
+                target = before.setdefault(state, dict())
+                for k, count in ways.items():
+                    target[k + mine] = target.get(k + mine, 0) + count
+                if mine:
+                    for k, count in _convolve(counts, ways).items():
+                        mines[k + 1] = mines.get(k + 1, 0) + count
+        after = before
+        marginals[cells[i]] = mines
+    return total, marginals
+
+
+def _convolve(a, b):
+    """Returns the counts of sums of a key of `a` and a key of `b`."""
+    result = dict()
+    for i, x in a.items():
+        for j, y in b.items():
+            result[i + j] = result.get(i + j, 0) + x * y
+    return result
@@ -0,0 +1,99 @@
+"""
+Headless Minesweeper simulator.
+
+Plays many seeded games between Minesweeper and MinesweeperAI across a
+process pool, without the pygame runner, and reports the win rate, the
+moves made per second and the time the AI spends per move.
+
+    python simulate.py --games 1000 --height 16 --width 30 --mines 99
+"""
+import argparse
+import logging
+import multiprocessing
+import random
+import time
+
+from minesweeper import Minesweeper, MinesweeperAI
+
+
+def play_game(height, width, mines, seed):
+    """
+    Plays one game with the board and the AI's random choices seeded by
+    `seed`. Returns whether the AI won, the number of moves it made, and
+    the seconds it spent choosing moves and adding knowledge.
+    """
+    random.seed(seed)
+    game = Minesweeper(height=height, width=width, mines=mines)
+    ai = MinesweeperAI(height=height, width=width, mines=mines)
+
+    thinking = 0
+    while len(ai.moves_made) < height * width - mines:
+        start = time.perf_counter()
+        move = ai.make_safe_move()
+        if move is None:
+            move = ai.make_random_move()
+        thinking += time.perf_counter() - start
+        if move is None:
+            break
+
+        if game.is_mine(move):
+            return False, len(ai.moves_made) + 1, thinking
+
+        start = time.perf_counter()
+        ai.add_knowledge(move, game.nearby_mines(move))
+        thinking += time.perf_counter() - start
+
+    return True, len(ai.moves_made), thinking
+
+
+def _play(args):
+    return play_game(*args)
+
+
+def simulate(games, height=8, width=8, mines=8, seed=0, processes=None):
+    """
+    Plays `games` games across a process pool, with seeds counting up from
+    `seed`. Returns a list of (won, moves, seconds thinking) per game.
+    """
+    jobs = [(height, width, mines, seed + game) for game in range(games)]
+    with multiprocessing.Pool(processes) as pool:
+        return pool.map(_play, jobs, chunksize=max(1, games // 64))
+
+
+def report(results, elapsed):
+    """Prints the win rate and timing of a list of game results."""
+    games = len(results)
+    wins = sum(1 for won, _, _ in results if won)
+    moves = sum(count for _, count, _ in results)
+    thinking = sum(seconds for _, _, seconds in results)
+    print(f"Games: {games}, won: {wins} ({100 * wins / games:.1f}%)")
+    print(f"Moves: {moves}, {moves / elapsed:,.0f} per second")
+    print(f"Inference per move: {1000 * thinking / max(1, moves):.3f} ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--games", type=int, default=100)
+    parser.add_argument("--height", type=int, default=8)
+    parser.add_argument("--width", type=int, default=8)
+    parser.add_argument("--mines", type=int, default=8)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--processes", type=int, default=None,
+                        help="worker processes (default: one per CPU)")
+    parser.add_argument("--verbose", action="store_true",
+                        help="log the AI's knowledge after every move")
+    args = parser.parse_args()
+
+    if args.verbose:
+        logging.basicConfig(level=logging.DEBUG, format="%(message)s")
+
+    start = time.perf_counter()
+    results = simulate(
+        args.games, args.height, args.width, args.mines,
+        args.seed, args.processes
+    )
+    report(results, time.perf_counter() - start)
+
+
+if __name__ == "__main__":
+    main()
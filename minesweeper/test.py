@@ -0,0 +1,84 @@
+"""
+Randomized cross-check of the linear deduction in linear.py.
+
+Builds random sets of sentences that are true of a hidden mine layout and
+checks that every cell deduce() fixes is fixed the same way in every
+layout that satisfies the sentences, found by trying them all.
+
+    python test.py --trials 1000
+"""
+import argparse
+import itertools
+import random
+import sys
+
+from linear import deduce
+
+
+def random_sentences(rng, cells):
+    """
+    Returns random (cells, count) sentences about `cells` that are true of
+    a random mine layout.
+    """
+    mines = {cell for cell in cells if rng.random() < 0.3}
+    sentences = []
+    for _ in range(rng.randint(1, 6)):
+        members = set(rng.sample(cells, rng.randint(1, 5)))
+        sentences.append((members, len(members & mines)))
+    return sentences
+
+
+def forced(sentences):
+    """
+    Returns the sets of cells that are safe and that are mines in every
+    layout satisfying `sentences`.
+    """
+    cells = sorted(set().union(*(cells for cells, _ in sentences)))
+    safe, mine = set(cells), set(cells)
+    for values in itertools.product([False, True], repeat=len(cells)):
+        layout = {cell for cell, value in zip(cells, values) if value}
+        if all(len(members & layout) == count
+               for members, count in sentences):
+            safe -= layout
+            mine &= layout
+    return safe, mine
+
+
+def check_deduce(rng, cells, trials):
+    """
+    Checks deduce() on `trials` random sentence sets. Returns the number
+    of sets where it fixed a cell wrongly, and the fraction of the forced
+    cells it found.
+    """
+    failures = 0
+    found = total = 0
+    for _ in range(trials):
+        sentences = random_sentences(rng, cells)
+        safe, mine = deduce(sentences)
+        expected_safe, expected_mine = forced(sentences)
+        if not (safe <= expected_safe and mine <= expected_mine):
+            print(f"deduce is wrong on {sentences}: safe {safe}, mines "
+                  f"{mine}, forced {expected_safe} and {expected_mine}")
+            failures += 1
+        found += len(safe) + len(mine)
+        total += len(expected_safe) + len(expected_mine)
+    return failures, found / max(1, total)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--trials", type=int, default=500)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    cells = [(i, j) for i in range(3) for j in range(4)]
+    failures, fraction = check_deduce(rng, cells, args.trials)
+    print(f"deduce: {args.trials} trials, {failures} wrong, "
+          f"{100 * fraction:.1f}% of forced cells found")
+    if failures:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
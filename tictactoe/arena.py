@@ -0,0 +1,171 @@
+"""
+Headless arena for the tic-tac-toe engines.
+
+Plays games between two engines (or an engine and a random player) across
+a process pool, without the pygame runner, and reports the results, the
+time taken per move, the nodes searched per second, and whether every
+move agrees with the reference minimax.
+
+    python arena.py bitboard random --games 1000
+"""
+import argparse
+import multiprocessing
+import random
+import time
+
+import bitboard
+import mnk
+import tictactoe as ttt
+
+ENGINES = ["table", "alphabeta", "bitboard", "mnk", "random"]
+
+# Per-process state, set up by _init_worker: each engine's move function,
+# and the object whose `nodes` counts the nodes of its last search
+_engines = dict()
+_check = True
+
+# Reference minimax value of each position, keyed by its cells
+_values = dict()
+
+
+def _init_worker(check):
+    global _check
+    _check = check
+    game = mnk.Game()
+    _engines.update({
+        "table": (ttt.minimax, ttt),
+        "alphabeta": (ttt.search, ttt),
+        "bitboard": (bitboard.minimax, bitboard),
+        "mnk": (game.best_move, game),
+    })
+
+
+def reference_value(board):
+    """
+    Returns the minimax value of the board, by the same recursion as the
+    reference max_value and min_value but remembering the value of every
+    position it visits, so each worker solves each position once.
+    """
+    key = tuple(cell for row in board for cell in row)
+    if key not in _values:
+        if ttt.terminal(board):
+            value = ttt.utility(board)
+        else:
+            values = [
+                reference_value(ttt.result(board, action))
+                for action in ttt.actions(board)
+            ]
+            value = max(values) if ttt.player(board) == ttt.X else min(values)
+        _values[key] = value
+    return _values[key]
+
+
+def agrees(board, action):
+    """
+    Returns True if `action` is an optimal move on the board, i.e. leads to
+    a position with the same reference value as the best move.
+    """
+    values = [
+        reference_value(ttt.result(board, move))
+        for move in ttt.actions(board)
+    ]
+    best = max(values) if ttt.player(board) == ttt.X else min(values)
+    return reference_value(ttt.result(board, action)) == best
+
+
+def play_game(players, seed):
+    """
+    Plays one game between `players`, the engine names for X and O.
+    Returns the utility of the final board and a record
+    (engine, seconds, nodes, agrees) for every move.
+    """
+    rng = random.Random(seed)
+    board = ttt.initial_state()
+    records = []
+    while not ttt.terminal(board):
+        name = players[0] if ttt.player(board) == ttt.X else players[1]
+        if name == "random":
+            action = rng.choice(sorted(ttt.actions(board)))
+            board = ttt.result(board, action)
+            continue
+
+        move, counter = _engines[name]
+        start = time.perf_counter()
+        action = move(board)
+        elapsed = time.perf_counter() - start
+        nodes = counter.nodes
+        agreed = agrees(board, action) if _check else None
+        records.append((name, elapsed, nodes, agreed))
+        board = ttt.result(board, action)
+    return ttt.utility(board), records
+
+
+def _play(args):
+    return play_game(*args)
+
+
+def run(players, games, seed=0, processes=None, check=True):
+    """
+    Plays `games` games between `players` across a process pool. Returns
+    the utilities of the games and the move records of all of them.
+    """
+    jobs = [(players, seed + game) for game in range(games)]
+    with multiprocessing.Pool(
+        processes, initializer=_init_worker, initargs=(check,)
+    ) as pool:
+        outcomes = pool.map(_play, jobs, chunksize=max(1, games // 64))
+    results = [result for result, _ in outcomes]
+    records = [record for _, moves in outcomes for record in moves]
+    return results, records
+
+
+def percentile(values, fraction):
+    """Returns the value below which `fraction` of sorted `values` fall."""
+    index = min(len(values) - 1, int(fraction * len(values)))
+    return values[index]
+
+
+def report(players, results, records):
+    """Prints the result distribution and per-engine move statistics."""
+    games = len(results)
+    print(f"{players[0]} (X) vs {players[1]} (O), {games} games")
+    for label, utility in (("X wins", 1), ("O wins", -1), ("Ties", 0)):
+        count = results.count(utility)
+        print(f"  {label}: {count} ({100 * count / games:.1f}%)")
+
+    for name in sorted({record[0] for record in records}):
+        moves = [record for record in records if record[0] == name]
+        times = sorted(record[1] for record in moves)
+        print(f"{name}: {len(moves)} moves")
+        print("  latency p50 {:.1f} us, p90 {:.1f} us, p99 {:.1f} us".format(
+            *(1e6 * percentile(times, f) for f in (0.5, 0.9, 0.99))
+        ))
+        nodes = sum(record[2] for record in moves)
+        print(f"  {nodes / len(moves):,.1f} nodes/move, "
+              f"{nodes / sum(times):,.0f} nodes/s")
+        if moves[0][3] is not None:
+            wrong = sum(1 for record in moves if not record[3])
+            print(f"  disagreements with reference minimax: {wrong}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("x", choices=ENGINES, help="engine playing X")
+    parser.add_argument("o", choices=ENGINES, help="engine playing O")
+    parser.add_argument("--games", type=int, default=100)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--processes", type=int, default=None,
+                        help="worker processes (default: one per CPU)")
+    parser.add_argument("--no-check", action="store_true",
+                        help="skip checking moves against reference minimax")
+    args = parser.parse_args()
+
+    players = (args.x, args.o)
+    results, records = run(
+        players, args.games, args.seed, args.processes, not args.no_check
+    )
+    report(players, results, records)
+
+
+if __name__ == "__main__":
+    main()
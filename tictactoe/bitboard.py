@@ -0,0 +1,229 @@
+"""
+Tic Tac Toe Player on bitboards
+
+Same interface as tictactoe.py (`import bitboard as ttt` is a drop-in
+replacement), with each side's marks stored as a 9-bit integer where
+bit 3 * i + j is cell (i, j).
+"""
+
+X = "X"
+O = "O"
+EMPTY = None
+
+FULL = 0b111111111
+
+WIN_MASKS = (
+    0b000000111, 0b000111000, 0b111000000,
+    0b001001001, 0b010010010, 0b100100100,
+    0b100010001, 0b001010100,
+)
+
+# Center first, then corners, then edges
+MOVE_ORDER = (4, 0, 2, 6, 8, 1, 3, 5, 7)
+
+# Transposition table: (marks of the side to move, marks of the other
+# side) -> exact value of the position for the side to move
+transpositions = dict()
+
+# Nodes searched by the last call to minimax
+nodes = 0
+
+
+class Board():
+    """
+    Immutable board. Indexing and iteration give rows of X, O and EMPTY,
+    like the nested lists used by tictactoe.py.
+    """
+
+    __slots__ = ("x", "o")
+
+    def __init__(self, x=0, o=0):
+        self.x = x
+        self.o = o
+
+    def __getitem__(self, i):
+        return tuple(self._cell(3 * i + j) for j in range(3))
+
+    def __iter__(self):
+        return (self[i] for i in range(3))
+
+    def __len__(self):
+        return 3
+
+    def __eq__(self, other):
+        return (isinstance(other, Board)
+                and self.x == other.x and self.o == other.o)
+
+    def __hash__(self):
+        return hash((self.x, self.o))
+
+    def __repr__(self):
+        return f"Board({self.x:#011b}, {self.o:#011b})"
+
+    def _cell(self, k):
+        if self.x >> k & 1:
+            return X
+        if self.o >> k & 1:
+            return O
+        return EMPTY
+
+
+def _bits(board):
+    """
+    Returns the (x, o) bitboards of a Board or of a nested list board.
+    """
+    if isinstance(board, Board):
+        return board.x, board.o
+    x = o = 0
+    for i, row in enumerate(board):
+        for j, cell in enumerate(row):
+            if cell == X:
+                x |= 1 << (3 * i + j)
+            elif cell == O:
+                o |= 1 << (3 * i + j)
+    return x, o
+
+
+def _wins(bits):
+    for mask in WIN_MASKS:
+        if bits & mask == mask:
+            return True
+    return False
+
+
+def initial_state():
+    """
+    Returns starting state of the board.
+    """
+    return Board()
+
+
+def player(board):
+    """
+    Returns player who has the next turn on a board.
+    """
+    x, o = _bits(board)
+    return X if x.bit_count() == o.bit_count() else O
+
+
+def actions(board):
+    """
+    Returns set of all possible actions (i, j) available on the board.
+    """
+    x, o = _bits(board)
+    empty = FULL & ~(x | o)
+    return {(k // 3, k % 3) for k in range(9) if empty >> k & 1}
+
+
+def result(board, action):
+    """
+    Returns the board that results from making move (i, j) on the board.
+    """
+    x, o = _bits(board)
+    i, j = action
+    if not (0 <= i < 3 and 0 <= j < 3) or (x | o) >> (3 * i + j) & 1:
+        raise Exception("Invalid action")
+    bit = 1 << (3 * i + j)
+    if x.bit_count() == o.bit_count():
+        return Board(x | bit, o)
+    return Board(x, o | bit)
+
+
+def winner(board):
+    """
+    Returns the winner of the game, if there is one.
+    """
+    x, o = _bits(board)
+    if _wins(x):
+        return X
+    if _wins(o):
+        return O
+    return None
+
+
+def terminal(board):
+    """
+    Returns True if game is over, False otherwise.
+    """
+    x, o = _bits(board)
+    return (x | o) == FULL or _wins(x) or _wins(o)
+
+
+def utility(board):
+    """
+    Returns 1 if X has won the game, -1 if O has won, 0 otherwise.
+    """
+    x, o = _bits(board)
+    if _wins(x):
+        return 1
+    if _wins(o):
+        return -1
+    return 0
+
+
+def minimax(board):
+    """
+    Returns the optimal action for the current player on the board.
+    """
+    global nodes
+    nodes = 0
+
+    x, o = _bits(board)
+    if (x | o) == FULL or _wins(x) or _wins(o):
+        return None
+
+    # Search from the point of view of the side to move
+    if x.bit_count() == o.bit_count():
+        me, them = x, o
+    else:
+        me, them = o, x
+
+    best, best_value = None, -2
+    for k in MOVE_ORDER:
+        bit = 1 << k
+        if (me | them) & bit:
+            continue
+        value = -_negamax(them, me | bit, -1, -best_value)
+        if value > best_value:
+            best, best_value = k, value
+            if value == 1:
+                break
+    return (best // 3, best % 3)
+
+
+def _negamax(me, them, alpha, beta):
+    """
+    Returns the value of the position for the side to move, whose marks
+    are `me`, or a bound on it outside the (alpha, beta) window.
+    """
+    global nodes
+    nodes += 1
+
+    if _wins(them):
+        return -1
+    occupied = me | them
+    if occupied == FULL:
+        return 0
+
+    key = (me, them)
+    if key in transpositions:
+        return transpositions[key]
+
+    value = -1
+    original_alpha = alpha
+    for k in MOVE_ORDER:
+        bit = 1 << k
+        if occupied & bit:
+            continue
+        value = max(value, -_negamax(them, me | bit, -beta, -alpha))
+        alpha = max(alpha, value)
+        if alpha >= beta:
+            break
+
+    # Values outside the window are only bounds, except for a lower bound
+    # of 1 or an upper bound of -1
+    if (original_alpha < value < beta
+            or value >= beta and value == 1
+            or value <= original_alpha and value == -1):
+        transpositions[key] = value
+    return value
@@ -0,0 +1,326 @@
+"""
+m,n,k-game Player
+
+Tic-tac-toe generalized to an m-row, n-column board where k marks in a
+row (horizontally, vertically or diagonally) win: 3,3,3 is tic-tac-toe,
+4,4,4 its 4x4 variant and 15,15,5 Gomoku. Boards are nested lists as in
+tictactoe.py.
+"""
+import random
+import time
+
+X = "X"
+O = "O"
+EMPTY = None
+
+# Score of a won position; heuristic scores stay well below it
+WIN = 10 ** 9
+
+# Bounds stored in the transposition table
+EXACT, LOWER, UPPER = 0, 1, 2
+
+
+class Timeout(Exception):
+    """Raised inside the search when the deadline has passed."""
+
+
+class Game():
+
+    def __init__(self, m=3, n=3, k=3):
+        """
+        Create a game on an m-row, n-column board with k in a row to win.
+        """
+        self.m = m
+        self.n = n
+        self.k = k
+
+        # Every line of k cells, as tuples of flat cell indices
+        self.windows = []
+        for i in range(m):
+            for j in range(n):
+                for di, dj in ((0, 1), (1, 0), (1, 1), (1, -1)):
+                    end_i, end_j = i + (k - 1) * di, j + (k - 1) * dj
+                    if 0 <= end_i < m and 0 <= end_j < n:
+                        self.windows.append(tuple(
+                            (i + s * di) * n + (j + s * dj) for s in range(k)
+                        ))
+
+        # Cells within reach of each cell, for choosing candidate moves
+        radius = 2 if m * n <= 36 else 1
+        self.nearby = [
+            [
+                a * n + b
+                for a in range(max(0, i - radius), min(m, i + radius + 1))
+                for b in range(max(0, j - radius), min(n, j + radius + 1))
+                if (a, b) != (i, j)
+            ]
+            for i in range(m) for j in range(n)
+        ]
+
+        # Zobrist keys for X and O on every cell
+        rng = random.Random(0)
+        self.zobrist = {
+            side: [rng.getrandbits(64) for _ in range(m * n)]
+            for side in (X, O)
+        }
+
+        # Transposition table: hash -> (depth, value, bound, best move)
+        self.transpositions = dict()
+
+        # Search statistics of the last best_move call
+        self.nodes = 0
+        self.depth = 0
+
+    def initial_state(self):
+        """
+        Returns starting state of the board.
+        """
+        return [[EMPTY] * self.n for _ in range(self.m)]
+
+    def player(self, board):
+        """
+        Returns player who has the next turn on a board.
+        """
+        x_count = sum(row.count(X) for row in board)
+        o_count = sum(row.count(O) for row in board)
+        return X if x_count == o_count else O
+
+    def actions(self, board):
+        """
+        Returns set of all possible actions (i, j) available on the board.
+        """
+        return {
+            (i, j)
+            for i in range(self.m) for j in range(self.n)
+            if board[i][j] is EMPTY
+        }
+
+    def result(self, board, action):
+        """
+        Returns the board that results from making move (i, j) on the board.
+        """
+        i, j = action
+        if not (0 <= i < self.m and 0 <= j < self.n) or board[i][j] is not EMPTY:
+            raise Exception("Invalid action")
+        board = [row[:] for row in board]
+        board[i][j] = self.player(board)
+        return board
+
+    def winner(self, board):
+        """
+        Returns the winner of the game, if there is one.
+        """
+        cells = [cell for row in board for cell in row]
+        for window in self.windows:
+            first = cells[window[0]]
+            if first is not EMPTY and all(cells[c] == first for c in window):
+                return first
+        return None
+
+    def wins_at(self, board, action):
+        """
+        Returns True if the mark at `action` completes k in a row, checking
+        only the lines through that cell.
+        """
+        i, j = action
+        side = board[i][j]
+        if side is EMPTY:
+            return False
+        cells = [cell for row in board for cell in row]
+        return self._wins_at(cells, i * self.n + j, side)
+
+    def terminal(self, board):
+        """
+        Returns True if game is over, False otherwise.
+        """
+        return (self.winner(board) is not None
+                or all(cell is not EMPTY for row in board for cell in row))
+
+    def utility(self, board):
+        """
+        Returns 1 if X has won the game, -1 if O has won, 0 otherwise.
+        """
+        win = self.winner(board)
+        if win == X:
+            return 1
+        if win == O:
+            return -1
+        return 0
+
+    def best_move(self, board, deadline=None):
+        """
+        Returns the best action found for the current player by iterative
+        deepening alpha-beta search, stopping at `deadline` (a
+        time.monotonic() value) if given. Without a deadline the search
+        runs until it has solved the tree of candidate moves, the empty
+        cells near a mark (see _candidates), so it is exhaustive only when
+        every empty cell is near one, as always on 3x3.
+        """
+        if self.terminal(board):
+            return None
+
+        cells = [cell for row in board for cell in row]
+        side = self.player(board)
+        key = 0
+        for index, cell in enumerate(cells):
+            if cell is not EMPTY:
+                key ^= self.zobrist[cell][index]
+
+        self.nodes = 0
+        self.depth = 0
+        self.deadline = deadline
+        moves = self._candidates(cells)
+        best = moves[0]
+
+        for depth in range(1, cells.count(EMPTY) + 1):
+            try:
+                value, move = self._root(cells, side, key, depth)
+            except Timeout:
+                break
+            best = move
+            self.depth = depth
+            if abs(value) >= WIN:
+                break
+
+        return (best // self.n, best % self.n)
+
+    def _root(self, cells, side, key, depth):
+        other = O if side == X else X
+        alpha, beta = -WIN - len(cells) - 1, WIN + len(cells) + 1
+        best = None
+        for move in self._ordered(cells, key):
+            cells[move] = side
+            try:
+                value = -self._negamax(
+                    cells, other, key ^ self.zobrist[side][move],
+                    depth - 1, -beta, -alpha, move
+                )
+            finally:
+                cells[move] = EMPTY
+            if best is None or value > alpha:
+                alpha, best = value, move
+        self.transpositions[key] = (depth, alpha, EXACT, best)
+        return alpha, best
+
+    def _negamax(self, cells, side, key, depth, alpha, beta, last):
+        """
+        Returns the value of the position for `side`, to move, searched
+        `depth` plies deep, or a bound on it outside (alpha, beta).
+        `last` is the cell of the opponent's last move.
+        """
+        # A node on a large board costs far more than reading the clock,
+        # so check the deadline at every one
+        self.nodes += 1
+        if self.deadline is not None and time.monotonic() >= self.deadline:
+            raise Timeout()
+
+        # Losses found sooner (with more depth left) score lower
+        if self._wins_at(cells, last, cells[last]):
+            return -WIN - depth
+        if EMPTY not in cells:
+            return 0
+        if depth == 0:
+            score = self._evaluate(cells)
+            return score if side == X else -score
+
+        entry = self.transpositions.get(key)
+        if entry is not None and entry[0] >= depth:
+            _, value, bound, _ = entry
+            if (bound == EXACT
+                    or bound == LOWER and value >= beta
+                    or bound == UPPER and value <= alpha):
+                return value
+
+        other = O if side == X else X
+        original_alpha = alpha
+        value = -WIN - len(cells) - 1
+        best = None
+        for move in self._ordered(cells, key):
+            cells[move] = side
+            try:
+                score = -self._negamax(
+                    cells, other, key ^ self.zobrist[side][move],
+                    depth - 1, -beta, -alpha, move
+                )
+            finally:
+                cells[move] = EMPTY
+            if score > value:
+                value, best = score, move
+            alpha = max(alpha, value)
+            if alpha >= beta:
+                break
+
+        if value <= original_alpha:
+            bound = UPPER
+        elif value >= beta:
+            bound = LOWER
+        else:
+            bound = EXACT
+        self.transpositions[key] = (depth, value, bound, best)
+        return value
+
+    def _wins_at(self, cells, index, side):
+        """
+        Returns True if `side` has k in a row through cell `index`.
+        """
+        i, j = divmod(index, self.n)
+        for di, dj in ((0, 1), (1, 0), (1, 1), (1, -1)):
+            count = 1
+            for sign in (1, -1):
+                a, b = i + sign * di, j + sign * dj
+                while (0 <= a < self.m and 0 <= b < self.n
+                       and cells[a * self.n + b] == side):
+                    count += 1
+                    a, b = a + sign * di, b + sign * dj
+            if count >= self.k:
+                return True
+        return False
+
+    def _candidates(self, cells):
+        """
+        Returns the empty cells next to a mark, or the center cell of an
+        empty board.
+        """
+        if all(cell is EMPTY for cell in cells):
+            return [(self.m // 2) * self.n + self.n // 2]
+        candidates = {
+            other
+            for index, cell in enumerate(cells) if cell is not EMPTY
+            for other in self.nearby[index] if cells[other] is EMPTY
+        }
+        if not candidates:
+            candidates = {i for i, cell in enumerate(cells) if cell is EMPTY}
+        return sorted(candidates)
+
+    def _ordered(self, cells, key):
+        """
+        Returns the candidate moves, the transposition table's best move
+        for this position first.
+        """
+        moves = self._candidates(cells)
+        entry = self.transpositions.get(key)
+        if entry is not None and entry[3] in moves:
+            moves.remove(entry[3])
+            moves.insert(0, entry[3])
+        return moves
+
+    def _evaluate(self, cells):
+        """
+        Returns a heuristic score from X's point of view: every line of k
+        cells still open to only one side counts for that side, more the
+        fuller it is.
+        """
+        score = 0
+        for window in self.windows:
+            xs = os = 0
+            for c in window:
+                cell = cells[c]
+                if cell == X:
+                    xs += 1
+                elif cell == O:
+                    os += 1
+            if xs and not os:
+                score += 10 ** xs
+            elif os and not xs:
+                score -= 10 ** os
+        return score
@@ -0,0 +1,77 @@
+"""
+Generates the perfect-play table loaded by tictactoe.py.
+
+Every position reachable from the empty board is solved once, up to the
+eight board symmetries. Run `python tablegen.py` after changing the search
+or the table format.
+"""
+import array
+import sys
+
+import tictactoe as ttt
+
+
+def solve_all():
+    """
+    Returns a dict from the canonical key of every reachable non-terminal
+    position to (best move in canonical orientation, minimax value).
+    """
+    table = dict()
+    frontier = ["." * 9]
+    seen = set(frontier)
+
+    while frontier:
+        key = frontier.pop()
+        cells = tuple(None if c == "." else c for c in key)
+        if ttt._winner(cells) is not None or ttt.EMPTY not in cells:
+            continue
+
+        turn = ttt.X if cells.count(ttt.X) == cells.count(ttt.O) else ttt.O
+        other = ttt.O if turn == ttt.X else ttt.X
+        best, best_value = None, None
+        for move in ttt.MOVE_ORDER:
+            if cells[move] is not ttt.EMPTY:
+                continue
+            child = cells[:move] + (turn,) + cells[move + 1:]
+
+            # A full window makes every value exact
+            value = ttt._alphabeta(child, other, -1, 1)
+            if (best is None
+                    or turn == ttt.X and value > best_value
+                    or turn == ttt.O and value < best_value):
+                best, best_value = move, value
+
+            child_key, _ = ttt._canonical_form(child)
+            if child_key not in seen:
+                seen.add(child_key)
+                frontier.append(child_key)
+
+        table[key] = (best, best_value)
+
+    return table
+
+
+def write(table, filename=ttt.TABLE_FILE):
+    """
+    Writes the table as pairs of unsigned 16-bit words: the base-3 code of
+    the canonical key, then the move plus 16 times (value + 1), in
+    little-endian byte order.
+    """
+    words = array.array("H")
+    for key in sorted(table, key=ttt._encode):
+        move, value = table[key]
+        words.extend([ttt._encode(key), move + 16 * (value + 1)])
+    if sys.byteorder != "little":
+        words.byteswap()
+    with open(filename, "wb") as f:
+        words.tofile(f)
+
+
+def main():
+    table = solve_all()
+    write(table)
+    print(f"Solved {len(table)} positions into {ttt.TABLE_FILE}")
+
+
+if __name__ == "__main__":
+    main()
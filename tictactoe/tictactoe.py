@@ -1,13 +1,86 @@
 """
 Tic Tac Toe Player
 """
+import array
 import math
 import copy
+import os
+import sys
 
 X = "X"
 O = "O"
 EMPTY = None
 
+# Cells are numbered 0-8 row by row in the flat (tuple) board used by search
+LINES = [(0, 1, 2), (3, 4, 5), (6, 7, 8),
+         (0, 3, 6), (1, 4, 7), (2, 5, 8),
+         (0, 4, 8), (2, 4, 6)]
+
+# Center first, then corners, then edges
+MOVE_ORDER = (4, 0, 2, 6, 8, 1, 3, 5, 7)
+
+
+def _symmetries():
+    """
+    Returns the 8 symmetries of the board, as permutations of cell numbers.
+    """
+    rotate = [3 * (2 - k % 3) + k // 3 for k in range(9)]
+    reflect = [3 * (k // 3) + 2 - k % 3 for k in range(9)]
+    symmetries = []
+    permutation = list(range(9))
+    for _ in range(4):
+        permutation = [permutation[k] for k in rotate]
+        symmetries.append(permutation)
+        symmetries.append([permutation[k] for k in reflect])
+    return symmetries
+
+
+SYMMETRIES = _symmetries()
+
+# Transposition table: canonical board key -> (value, bound)
+EXACT, LOWER, UPPER = 0, 1, 2
+transpositions = dict()
+
+# Nodes searched by the last call to minimax
+nodes = 0
+
+# Perfect-play table written by tablegen.py
+TABLE_FILE = os.path.join(
+    os.path.dirname(os.path.abspath(__file__)), "perfect_play.bin"
+)
+
+
+def _encode(key):
+    """
+    Returns the base-3 code of a board key.
+    """
+    code = 0
+    for cell in key:
+        code = 3 * code + ".XO".index(cell)
+    return code
+
+
+def _load_table():
+    """
+    Returns the perfect-play table as a dict from the code of a canonical
+    key to (best move, minimax value), or an empty dict if it is missing.
+    """
+    words = array.array("H")
+    try:
+        with open(TABLE_FILE, "rb") as f:
+            words.frombytes(f.read())
+    except OSError:
+        return dict()
+    if sys.byteorder != "little":
+        words.byteswap()
+    return {
+        words[k]: (words[k + 1] % 16, words[k + 1] // 16 - 1)
+        for k in range(0, len(words), 2)
+    }
+
+
+perfect_play = _load_table()
+
 
 def initial_state():
     """
@@ -123,26 +196,131 @@ def utility(board):
 
 def minimax(board):
     """
-    Retorna la acción óptima para el jugador actual en el tablero.
+    Returns the optimal action for the current player on the board.
     """
+    global nodes
+    nodes = 0
+
     if terminal(board):
         return None
 
-    elif player(board) == 'X':
-        plays = []
-        for action in actions(board):
-            plays.append([min_value(result(board, action)), action])
-        
-        return sorted(plays, key=lambda x: x[0], reverse=True)[0][1]
+    cells = tuple(cell for row in board for cell in row)
+    key, permutation = _canonical_form(cells)
+    if _encode(key) in perfect_play:
+        move = permutation[perfect_play[_encode(key)][0]]
+        return (move // 3, move % 3)
+    return search(board)
+
+
+def search(board):
+    """
+    Returns the optimal action for the current player on the board, found
+    by alpha-beta search alone, without consulting the perfect-play table.
+    """
+    global nodes
+    nodes = 0
+
+    if terminal(board):
+        return None
+
+    cells = tuple(cell for row in board for cell in row)
+    turn = player(board)
+    alpha, beta = -1, 1
+    best = None
+    for move in MOVE_ORDER:
+        if cells[move] is not EMPTY:
+            continue
+        child = cells[:move] + (turn,) + cells[move + 1:]
+        value = _alphabeta(child, O if turn == X else X, alpha, beta)
+        if turn == X and (best is None or value > alpha):
+            alpha, best = value, move
+        elif turn == O and (best is None or value < beta):
+            beta, best = value, move
+        if alpha >= beta:
+            break
+
+    return (best // 3, best % 3)
+
+
+def _winner(cells):
+    for a, b, c in LINES:
+        if cells[a] is not EMPTY and cells[a] == cells[b] == cells[c]:
+            return cells[a]
+    return None
+
+
+def _canonical(cells):
+    """
+    Returns a key shared by all boards that are symmetric to `cells`.
+    """
+    key = "".join(cell or "." for cell in cells)
+    return min(
+        "".join(key[k] for k in permutation) for permutation in SYMMETRIES
+    )
+
+
+def _canonical_form(cells):
+    """
+    Returns the canonical key of `cells` and the symmetry producing it:
+    cell k of the canonical board is cell permutation[k] of `cells`.
+    """
+    key = "".join(cell or "." for cell in cells)
+    return min(
+        ("".join(key[k] for k in permutation), permutation)
+        for permutation in SYMMETRIES
+    )
+
+
+def _alphabeta(cells, turn, alpha, beta):
+    """
+    Returns the minimax value of the flat board `cells` with `turn` to move,
+    or a bound on it outside the (alpha, beta) window.
+    """
+    global nodes
+    nodes += 1
+
+    win = _winner(cells)
+    if win is not None:
+        return 1 if win == X else -1
+    if EMPTY not in cells:
+        return 0
+
+    key = _canonical(cells)
+    if key in transpositions:
+        value, bound = transpositions[key]
+        if (bound == EXACT
+                or bound == LOWER and value >= beta
+                or bound == UPPER and value <= alpha):
+            return value
+
+    window = alpha, beta
+    if turn == X:
+        value = -1
+        for move in MOVE_ORDER:
+            if cells[move] is EMPTY:
+                child = cells[:move] + (X,) + cells[move + 1:]
+                value = max(value, _alphabeta(child, O, alpha, beta))
+                alpha = max(alpha, value)
+                if alpha >= beta:
+                    break
+    else:
+        value = 1
+        for move in MOVE_ORDER:
+            if cells[move] is EMPTY:
+                child = cells[:move] + (O,) + cells[move + 1:]
+                value = min(value, _alphabeta(child, X, alpha, beta))
+                beta = min(beta, value)
+                if alpha >= beta:
+                    break
+
+    if value <= window[0]:
+        transpositions[key] = (value, UPPER)
+    elif value >= window[1]:
+        transpositions[key] = (value, LOWER)
+    else:
+        transpositions[key] = (value, EXACT)
+    return value
 
-    elif player(board) == 'O':
-        plays = []
-        for action in actions(board):
-            plays.append([max_value(result(board, action)), action])
-        
-        print(sorted(plays, key=lambda x: x[0]))
-        return sorted(plays, key=lambda x: x[0])[0][1]
-    
 
 def max_value(board):
 